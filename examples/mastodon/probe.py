@@ -3,21 +3,21 @@ import requests
 url = "http://localhost:3000"
 token = "P48t7hDUJUDHWnaIdlEiGZvd0lpcuzWUfhmGu2e7jqk"
 
+# Keep-alive: every request reuses the same TCP connection.
+session = requests.Session()
+session.headers["Authorization"] = f"Bearer {token}"
+
 def post():
-    post = requests.post(f"{url}/api/v1/statuses", headers={
-        "Authorization": f"Bearer {token}"
-    }, json={
+    post = session.post(f"{url}/api/v1/statuses", json={
         "status": "Hey!",
     })
     print(post.text)
 
 def read():
-    convos = requests.get(f"{url}/api/v1/statuses", headers={
-        "Authorization": f"Bearer {token}"
-    })
+    convos = session.get(f"{url}/api/v1/statuses")
     assert convos.status_code == 200
 
-    user = requests.get(f"{url}/@lev.json")
+    user = session.get(f"{url}/@lev.json")
     assert user.status_code == 200
 
 if __name__ == "__main__":
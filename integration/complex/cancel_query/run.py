@@ -17,23 +17,24 @@ async def trigger_shutdown() -> None:
         database="pgdog",
         user="pgdog",
         password="pgdog",
+        # Sent in the startup packet, saving a round trip for SET.
+        server_settings={"application_name": APPLICATION_NAME},
     )
 
     try:
-        await conn.execute(f"SET application_name = '{APPLICATION_NAME}'")
         sleep_task = asyncio.create_task(conn.execute(f"SELECT pg_sleep({SLEEP_SECONDS})"))
 
         # Give the backend time to register the long running query.
         await asyncio.sleep(1)
 
-        admin = psycopg.connect(
-            "dbname=admin user=admin host=127.0.0.1 port=6432 password=pgdog"
+        admin = await psycopg.AsyncConnection.connect(
+            "dbname=admin user=admin host=127.0.0.1 port=6432 password=pgdog",
+            autocommit=True,
         )
-        admin.autocommit = True
         try:
-            admin.execute("SHUTDOWN")
+            await admin.execute("SHUTDOWN")
         finally:
-            admin.close()
+            await admin.close()
 
         try:
             await asyncio.wait_for(sleep_task, timeout=SHUTDOWN_TIMEOUT)
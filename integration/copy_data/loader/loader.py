@@ -5,34 +5,151 @@ Generates ~50-100GB of test data.
 """
 
 import argparse
-import json
 import random
 import string
+import struct
 import sys
+import threading
 import time
-from concurrent.futures import ProcessPoolExecutor, as_completed
-from datetime import datetime, timedelta, timezone
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import get_context
+from queue import Full, Queue
 from typing import Generator
 
 import numpy as np
 import psycopg
 
+# Seconds between progress lines printed by each loader.
+PROGRESS_INTERVAL = 1.0
+
+# copy_data.users is hash partitioned on tenant_id.
+USERS_PARTITIONS = 2
+
+# PostgreSQL binary COPY framing: signature, flags and extension length
+# go first, a -1 field count marks the end of the stream.
+PGCOPY_HEADER = b"PGCOPY\n\xff\r\n\0" + b"\0" * 8
+PGCOPY_TRAILER = b"\xff\xff"
+# One encoded COPY batch: its row count and binary rows.
+Batch = tuple[int, bytes | bytearray]
+# 2000-01-01 UTC, in microseconds since the Unix epoch.
+PG_EPOCH_US = 946_684_800_000_000
+
+# Each field is prefixed with its length in bytes, NULL is length -1.
+FIELD_COUNT = struct.Struct(">h")
+FIELD_LENGTH = struct.Struct(">i")
+INT8 = struct.Struct(">iq")
+NULL = FIELD_LENGTH.pack(-1)
+LENGTH_4 = FIELD_LENGTH.pack(4)
+LENGTH_8 = FIELD_LENGTH.pack(8)
+JSONB_VERSION = b"\x01"
+
+# users.settings, filled in with bytes %-formatting. Every value is
+# generated ASCII that never needs JSON escaping.
+SETTINGS_TEMPLATE = (
+    b'{"theme": "%s", "notifications": %s, "preferences": {"language": "%s", '
+    b'"timezone": "%s", "bio": "%s", "address": "%s", "phone": "%s", "metadata": "%s"}}'
+)
+
+# Static text prepended to generated columns.
+PRODUCT_PREFIX = b"Product "
+USER_AGENT_PREFIX = b"Mozilla/5.0 "
+
+# Field count and the fixed-width columns at the start of each row,
+# packed with a single call per row.
+USERS_ROW = struct.Struct(">hiqiq")
+LOG_ACTIONS_ROW = struct.Struct(">hiq")
+
+
+def encode_int8(buf: bytearray, value: int | None):
+    if value is None:
+        buf += NULL
+    else:
+        buf += INT8.pack(8, value)
+
+
+def encode_bytes(buf: bytearray, value: bytes):
+    buf += FIELD_LENGTH.pack(len(value))
+    buf += value
+
+
+def encode_prefixed(buf: bytearray, prefix: bytes, value: bytes):
+    buf += FIELD_LENGTH.pack(len(prefix) + len(value))
+    buf += prefix
+    buf += value
+
+
+def encode_jsonb(buf: bytearray, value: bytes):
+    buf += FIELD_LENGTH.pack(len(value) + 1)
+    buf += JSONB_VERSION
+    buf += value
+
+
+def encode_timestamptz(buf: bytearray, value: int | None):
+    """Timestamps are microseconds since 2000-01-01 UTC."""
+    encode_int8(buf, value)
+
+
+def pack_rows(
+    fields: list[np.ndarray | bytes], mask: np.ndarray | None = None
+) -> bytes:
+    """Encode rows made only of fixed-width fields in a single numpy pass.
+
+    Arrays hold one big-endian value per row, bytes are repeated on every
+    row (field count, field lengths, NULLs). If a mask is given, only the
+    selected rows are encoded.
+    """
+    columns = [
+        field[mask] if isinstance(field, np.ndarray) and mask is not None else field
+        for field in fields
+    ]
+    count = next(len(column) for column in columns if isinstance(column, np.ndarray))
+    rows = np.empty(
+        count,
+        dtype=[
+            (
+                f"f{i}",
+                column.dtype if isinstance(column, np.ndarray) else f"S{len(column)}",
+            )
+            for i, column in enumerate(columns)
+        ],
+    )
+    for i, column in enumerate(columns):
+        rows[f"f{i}"] = column
+    return rows.tobytes()
+
 
 def random_text(length: int) -> str:
     return "".join(random.choices(string.ascii_uppercase, k=length))
 
 
-def random_texts_numpy(count: int, length: int) -> list[str]:
-    """Generate random texts using numpy for speed."""
-    chars = np.random.randint(65, 91, size=(count, length), dtype=np.uint8)
-    return ["".join(chr(c) for c in row) for row in chars]
+def random_texts_numpy(
+    rng: np.random.Generator, count: int, length: int
+) -> list[bytes]:
+    """Generate random ASCII texts using numpy for speed.
+
+    Texts stay bytes all the way to the COPY buffer.
+    """
+    return random_text_array(rng, count, length).tolist()
+
+
+def random_text_array(rng: np.random.Generator, count: int, length: int) -> np.ndarray:
+    """Generate random texts as a fixed-width bytes array."""
+    return rng.integers(65, 91, size=count * length, dtype=np.uint8).view(f"S{length}")
+
 
+def pg_now() -> int:
+    """Current time in microseconds since the PostgreSQL epoch."""
+    return time.time_ns() // 1000 - PG_EPOCH_US
 
-def random_timestamps(count: int, days_back: int = 730) -> list[str]:
-    """Generate random timestamps within the last N days."""
-    now = datetime.now(timezone.utc)
-    offsets = np.random.uniform(0, days_back * 86400, count)
-    return [(now - timedelta(seconds=float(off))).isoformat() for off in offsets]
+
+def random_timestamps(
+    rng: np.random.Generator, count: int, now: int, days_back: int = 730
+) -> np.ndarray:
+    """Generate random timestamps within N days before now,
+    in microseconds since the PostgreSQL epoch."""
+    offsets = rng.integers(0, days_back * 86_400_000_000, count, dtype=np.int64)
+    return now - offsets
 
 
 def format_duration(seconds: float) -> str:
@@ -47,345 +164,465 @@ def format_duration(seconds: float) -> str:
 def create_schema(conninfo: str):
     """Create the schema and tables."""
     with psycopg.connect(conninfo) as conn:
-        conn.execute("CREATE SCHEMA IF NOT EXISTS copy_data")
-
-        # Users table with partitions
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS copy_data.users (
-                id BIGINT NOT NULL,
-                tenant_id BIGINT NOT NULL,
-                email VARCHAR NOT NULL,
-                created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-                settings JSONB NOT NULL DEFAULT '{}'::jsonb,
-                PRIMARY KEY(id, tenant_id)
-            ) PARTITION BY HASH(tenant_id)
-        """)
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS copy_data.users_0 PARTITION OF copy_data.users
-                FOR VALUES WITH (MODULUS 2, REMAINDER 0)
-        """)
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS copy_data.users_1 PARTITION OF copy_data.users
-                FOR VALUES WITH (MODULUS 2, REMAINDER 1)
-        """)
-
-        # Orders table
-        conn.execute("DROP TABLE IF EXISTS copy_data.order_items")
-        conn.execute("DROP TABLE IF EXISTS copy_data.orders")
-        conn.execute("""
-            CREATE TABLE copy_data.orders (
-                id BIGINT PRIMARY KEY,
-                user_id BIGINT NOT NULL,
-                tenant_id BIGINT NOT NULL,
-                amount DOUBLE PRECISION NOT NULL DEFAULT 0.0,
-                created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-                refunded_at TIMESTAMPTZ,
-                notes TEXT
-            )
-        """)
-
-        # Order items table
-        conn.execute("""
-            CREATE TABLE copy_data.order_items (
-                id BIGINT PRIMARY KEY,
-                user_id BIGINT NOT NULL,
-                tenant_id BIGINT NOT NULL,
-                order_id BIGINT NOT NULL,
-                product_name TEXT NOT NULL,
-                amount DOUBLE PRECISION NOT NULL DEFAULT 0.0,
-                quantity INT NOT NULL DEFAULT 1,
-                created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-                refunded_at TIMESTAMPTZ
-            )
-        """)
-
-        # Log actions table
-        conn.execute("DROP TABLE IF EXISTS copy_data.log_actions")
-        conn.execute("""
-            CREATE TABLE copy_data.log_actions (
-                id BIGINT PRIMARY KEY,
-                tenant_id BIGINT,
-                user_id BIGINT,
-                action VARCHAR(50),
-                details TEXT,
-                ip_address VARCHAR(45),
-                user_agent TEXT,
-                created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
-            )
-        """)
-
-        # With identity table
-        conn.execute("DROP TABLE IF EXISTS copy_data.with_identity")
-        conn.execute("""
-            CREATE TABLE copy_data.with_identity (
-                id BIGINT GENERATED ALWAYS AS IDENTITY,
-                tenant_id BIGINT NOT NULL,
-                data TEXT
-            )
-        """)
-
-        conn.execute("TRUNCATE copy_data.users CASCADE")
+        with conn.pipeline():
+            conn.execute("CREATE SCHEMA IF NOT EXISTS copy_data")
+
+            # Users table with partitions
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS copy_data.users (
+                    id BIGINT NOT NULL,
+                    tenant_id BIGINT NOT NULL,
+                    email VARCHAR NOT NULL,
+                    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                    settings JSONB NOT NULL DEFAULT '{}'::jsonb,
+                    PRIMARY KEY(id, tenant_id)
+                ) PARTITION BY HASH(tenant_id)
+            """)
+            for remainder in range(USERS_PARTITIONS):
+                conn.execute(f"""
+                    CREATE TABLE IF NOT EXISTS copy_data.users_{remainder} PARTITION OF copy_data.users
+                        FOR VALUES WITH (MODULUS {USERS_PARTITIONS}, REMAINDER {remainder})
+                """)
+
+            # Orders table
+            conn.execute("DROP TABLE IF EXISTS copy_data.order_items")
+            conn.execute("DROP TABLE IF EXISTS copy_data.orders")
+            conn.execute("""
+                CREATE TABLE copy_data.orders (
+                    id BIGINT PRIMARY KEY,
+                    user_id BIGINT NOT NULL,
+                    tenant_id BIGINT NOT NULL,
+                    amount DOUBLE PRECISION NOT NULL DEFAULT 0.0,
+                    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                    refunded_at TIMESTAMPTZ,
+                    notes TEXT
+                )
+            """)
+
+            # Order items table
+            conn.execute("""
+                CREATE TABLE copy_data.order_items (
+                    id BIGINT PRIMARY KEY,
+                    user_id BIGINT NOT NULL,
+                    tenant_id BIGINT NOT NULL,
+                    order_id BIGINT NOT NULL,
+                    product_name TEXT NOT NULL,
+                    amount DOUBLE PRECISION NOT NULL DEFAULT 0.0,
+                    quantity INT NOT NULL DEFAULT 1,
+                    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                    refunded_at TIMESTAMPTZ
+                )
+            """)
+
+            # Log actions table
+            conn.execute("DROP TABLE IF EXISTS copy_data.log_actions")
+            conn.execute("""
+                CREATE TABLE copy_data.log_actions (
+                    id BIGINT PRIMARY KEY,
+                    tenant_id BIGINT,
+                    user_id BIGINT,
+                    action VARCHAR(50),
+                    details TEXT,
+                    ip_address VARCHAR(45),
+                    user_agent TEXT,
+                    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+                )
+            """)
+
+            # With identity table
+            conn.execute("DROP TABLE IF EXISTS copy_data.with_identity")
+            conn.execute("""
+                CREATE TABLE copy_data.with_identity (
+                    id BIGINT GENERATED ALWAYS AS IDENTITY,
+                    tenant_id BIGINT NOT NULL,
+                    data TEXT
+                )
+            """)
+
+            conn.execute("TRUNCATE copy_data.users CASCADE")
         conn.commit()
         print("Schema created successfully")
 
 
-def load_users(conninfo: str, total: int, batch_size: int = 100_000) -> dict:
-    """Load users table using COPY."""
+def copy_batches(
+    conninfo: str,
+    table: str,
+    columns: str,
+    total: int,
+    batches: Generator[Batch, None, None],
+    name: str | None = None,
+) -> dict:
+    """Stream binary COPY batches into a table.
+
+    Batches are encoded on a background thread, so the next one is generated
+    while Postgres is ingesting the previous one.
+    """
+    name = name or table
     start = time.time()
     loaded = 0
+    last_progress = 0.0
+    pending: Queue = Queue(maxsize=2)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        # Stop waiting on a full queue once the COPY has failed,
+        # nobody is going to read it again.
+        while not stop.is_set():
+            try:
+                pending.put(item, timeout=0.1)
+                return True
+            except Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for batch in batches:
+                if not put(batch):
+                    return
+            put(None)
+        except Exception as e:
+            put(e)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+
+    try:
+        with psycopg.connect(conninfo) as conn:
+            with conn.cursor() as cur:
+                with cur.copy(
+                    f"COPY copy_data.{table} ({columns}) FROM STDIN WITH (FORMAT BINARY)"
+                ) as copy:
+                    copy.write(PGCOPY_HEADER)
+                    while (batch := pending.get()) is not None:
+                        if isinstance(batch, Exception):
+                            raise batch
+                        rows, buf = batch
+                        copy.write(buf)
+
+                        loaded += rows
+                        if time.monotonic() - last_progress < PROGRESS_INTERVAL:
+                            continue
+
+                        last_progress = time.monotonic()
+                        elapsed = time.time() - start
+                        rate = loaded / elapsed if elapsed > 0 else 0
+                        print(
+                            f"  {name}: {loaded:,}/{total:,} ({100*loaded/total:.1f}%) - {rate:,.0f} rows/s"
+                        )
+                    copy.write(PGCOPY_TRAILER)
+
+            conn.commit()
+    finally:
+        stop.set()
+        producer.join()
+
+    elapsed = time.time() - start
+    return {"table": name, "rows": loaded, "elapsed": elapsed}
+
 
-    themes = ["light", "dark", "auto"]
-    languages = ["en", "es", "fr", "de", "ja", "zh"]
-    timezones = ["UTC", "America/New_York", "Europe/London", "Asia/Tokyo"]
+def users_partition_tenants(conninfo: str, partition: int) -> np.ndarray:
+    """Tenants stored in a users partition, as a mask indexed by tenant_id.
 
+    Hash partitioning uses the server's hash function, so ask Postgres
+    instead of reimplementing it.
+    """
     with psycopg.connect(conninfo) as conn:
-        with conn.cursor() as cur:
-            with cur.copy(
-                "COPY copy_data.users (id, tenant_id, email, created_at, settings) FROM STDIN"
-            ) as copy:
-                for batch_start in range(0, total, batch_size):
-                    batch_end = min(batch_start + batch_size, total)
-                    batch_count = batch_end - batch_start
-
-                    timestamps = random_timestamps(batch_count)
-                    bios = random_texts_numpy(batch_count, 200)
-                    addresses = random_texts_numpy(batch_count, 100)
-                    phones = random_texts_numpy(batch_count, 20)
-                    metadata = random_texts_numpy(batch_count, 100)
-
-                    for i, idx in enumerate(range(batch_start + 1, batch_end + 1)):
-                        tenant_id = ((idx - 1) % 1000) + 1
-                        email = f"user_{idx}_tenant_{tenant_id}@example.com"
-                        settings = json.dumps(
-                            {
-                                "theme": random.choice(themes),
-                                "notifications": random.random() > 0.5,
-                                "preferences": {
-                                    "language": random.choice(languages),
-                                    "timezone": random.choice(timezones),
-                                    "bio": bios[i],
-                                    "address": addresses[i],
-                                    "phone": phones[i],
-                                    "metadata": metadata[i],
-                                },
-                            }
-                        )
-                        copy.write_row((idx, tenant_id, email, timestamps[i], settings))
+        rows = conn.execute(
+            """
+            SELECT satisfies_hash_partition('copy_data.users'::regclass, %s::int, %s::int, tenant_id)
+            FROM generate_series(1::bigint, 1000) AS tenant_id
+            ORDER BY tenant_id
+            """,
+            (USERS_PARTITIONS, partition),
+        ).fetchall()
+    return np.array([False] + [row[0] for row in rows])
+
+
+def users_batches(
+    total: int, batch_size: int, tenants: np.ndarray
+) -> Generator[Batch, None, None]:
+    rng = np.random.default_rng()
+    now = pg_now()
+
+    themes = [b"light", b"dark", b"auto"]
+    booleans = [b"false", b"true"]
+    languages = [b"en", b"es", b"fr", b"de", b"ja", b"zh"]
+    timezones = [b"UTC", b"America/New_York", b"Europe/London", b"Asia/Tokyo"]
+
+    for batch_start in range(0, total, batch_size):
+        batch_end = min(batch_start + batch_size, total)
+        ids = np.arange(batch_start + 1, batch_end + 1)
+        ids = ids[tenants[(ids - 1) % 1000 + 1]].tolist()
+        batch_count = len(ids)
+
+        timestamps = random_timestamps(rng, batch_count, now).tolist()
+        bios = random_texts_numpy(rng, batch_count, 200)
+        addresses = random_texts_numpy(rng, batch_count, 100)
+        phones = random_texts_numpy(rng, batch_count, 20)
+        metadata = random_texts_numpy(rng, batch_count, 100)
+        theme_indices = rng.integers(0, len(themes), batch_count).tolist()
+        notifications = (rng.random(batch_count) > 0.5).tolist()
+        language_indices = rng.integers(0, len(languages), batch_count).tolist()
+        timezone_indices = rng.integers(0, len(timezones), batch_count).tolist()
+
+        buf = bytearray()
+        for i, idx in enumerate(ids):
+            tenant_id = ((idx - 1) % 1000) + 1
+            email = b"user_%d_tenant_%d@example.com" % (idx, tenant_id)
+            settings = SETTINGS_TEMPLATE % (
+                themes[theme_indices[i]],
+                booleans[notifications[i]],
+                languages[language_indices[i]],
+                timezones[timezone_indices[i]],
+                bios[i],
+                addresses[i],
+                phones[i],
+                metadata[i],
+            )
+            buf += USERS_ROW.pack(5, 8, idx, 8, tenant_id)
+            encode_bytes(buf, email)
+            encode_timestamptz(buf, timestamps[i])
+            encode_jsonb(buf, settings)
 
-                    loaded = batch_end
-                    elapsed = time.time() - start
-                    rate = loaded / elapsed if elapsed > 0 else 0
-                    print(
-                        f"  users: {loaded:,}/{total:,} ({100*loaded/total:.1f}%) - {rate:,.0f} rows/s"
-                    )
+        yield batch_count, buf
 
-        conn.commit()
 
-    elapsed = time.time() - start
-    return {"table": "users", "rows": loaded, "elapsed": elapsed}
+def load_users(
+    conninfo: str, total: int, partition: int, batch_size: int = 100_000
+) -> dict:
+    """Load one users partition using COPY.
+
+    Rows are copied straight into the partition, skipping tuple routing,
+    so each partition can be loaded by its own worker.
+    """
+    tenants = users_partition_tenants(conninfo, partition)
+    partition_total = int(tenants[np.arange(total) % 1000 + 1].sum())
+    return copy_batches(
+        conninfo,
+        f"users_{partition}",
+        "id, tenant_id, email, created_at, settings",
+        partition_total,
+        users_batches(total, batch_size, tenants),
+    )
+
+
+def orders_batches(total: int, batch_size: int) -> Generator[Batch, None, None]:
+    rng = np.random.default_rng()
+    now = pg_now()
+    field_count = FIELD_COUNT.pack(7)
+    notes_length = FIELD_LENGTH.pack(50)
+
+    for batch_start in range(0, total, batch_size):
+        batch_end = min(batch_start + batch_size, total)
+        batch_count = batch_end - batch_start
+
+        ids = np.arange(batch_start + 1, batch_end + 1, dtype=">i8")
+        user_ids = rng.integers(1, 5_000_001, batch_count).astype(">i8")
+        tenant_ids = rng.integers(1, 1001, batch_count).astype(">i8")
+        amounts = np.round(10 + rng.random(batch_count) * 990, 2).astype(">f8")
+        timestamps = random_timestamps(rng, batch_count, now).astype(">i8")
+        refund_flags = rng.random(batch_count) < 0.05
+        refund_times = random_timestamps(rng, batch_count, now, 365).astype(">i8")
+        notes = random_text_array(rng, batch_count, 50)
+
+        fields = [
+            field_count,
+            LENGTH_8,
+            ids,
+            LENGTH_8,
+            user_ids,
+            LENGTH_8,
+            tenant_ids,
+            LENGTH_8,
+            amounts,
+            LENGTH_8,
+            timestamps,
+        ]
+        # Refunded and not refunded orders are encoded separately,
+        # since refunded_at is NULL for the latter.
+        buf = pack_rows(
+            fields + [LENGTH_8, refund_times, notes_length, notes], refund_flags
+        ) + pack_rows(fields + [NULL, notes_length, notes], ~refund_flags)
+
+        yield batch_count, buf
 
 
 def load_orders(conninfo: str, total: int, batch_size: int = 100_000) -> dict:
     """Load orders table using COPY."""
-    start = time.time()
-    loaded = 0
-
-    with psycopg.connect(conninfo) as conn:
-        with conn.cursor() as cur:
-            with cur.copy(
-                "COPY copy_data.orders (id, user_id, tenant_id, amount, created_at, refunded_at, notes) FROM STDIN"
-            ) as copy:
-                for batch_start in range(0, total, batch_size):
-                    batch_end = min(batch_start + batch_size, total)
-                    batch_count = batch_end - batch_start
-
-                    user_ids = np.random.randint(1, 5_000_001, batch_count)
-                    tenant_ids = np.random.randint(1, 1001, batch_count)
-                    amounts = np.round(10 + np.random.random(batch_count) * 990, 2)
-                    timestamps = random_timestamps(batch_count)
-                    refund_flags = np.random.random(batch_count) < 0.05
-                    refund_times = random_timestamps(batch_count, 365)
-                    notes = random_texts_numpy(batch_count, 50)
-
-                    for i, idx in enumerate(range(batch_start + 1, batch_end + 1)):
-                        refunded_at = refund_times[i] if refund_flags[i] else None
-                        copy.write_row(
-                            (
-                                idx,
-                                int(user_ids[i]),
-                                int(tenant_ids[i]),
-                                float(amounts[i]),
-                                timestamps[i],
-                                refunded_at,
-                                notes[i],
-                            )
-                        )
+    return copy_batches(
+        conninfo,
+        "orders",
+        "id, user_id, tenant_id, amount, created_at, refunded_at, notes",
+        total,
+        orders_batches(total, batch_size),
+    )
 
-                    loaded = batch_end
-                    elapsed = time.time() - start
-                    rate = loaded / elapsed if elapsed > 0 else 0
-                    print(
-                        f"  orders: {loaded:,}/{total:,} ({100*loaded/total:.1f}%) - {rate:,.0f} rows/s"
-                    )
 
-        conn.commit()
+def order_items_batches(
+    total: int, max_order_id: int, batch_size: int
+) -> Generator[Batch, None, None]:
+    rng = np.random.default_rng()
+    now = pg_now()
+    field_count = FIELD_COUNT.pack(9)
+    product_name_length = FIELD_LENGTH.pack(len(PRODUCT_PREFIX) + 30)
+
+    for batch_start in range(0, total, batch_size):
+        batch_end = min(batch_start + batch_size, total)
+        batch_count = batch_end - batch_start
+
+        ids = np.arange(batch_start + 1, batch_end + 1, dtype=">i8")
+        user_ids = rng.integers(1, 5_000_001, batch_count).astype(">i8")
+        tenant_ids = rng.integers(1, 1001, batch_count).astype(">i8")
+        order_ids = rng.integers(1, max_order_id + 1, batch_count).astype(">i8")
+        amounts = np.round(5 + rng.random(batch_count) * 195, 2).astype(">f8")
+        quantities = rng.integers(1, 6, batch_count).astype(">i4")
+        timestamps = random_timestamps(rng, batch_count, now).astype(">i8")
+        refund_flags = rng.random(batch_count) < 0.05
+        refund_times = random_timestamps(rng, batch_count, now, 365).astype(">i8")
+        product_names = random_text_array(rng, batch_count, 30)
+
+        fields = [
+            field_count,
+            LENGTH_8,
+            ids,
+            LENGTH_8,
+            user_ids,
+            LENGTH_8,
+            tenant_ids,
+            LENGTH_8,
+            order_ids,
+            product_name_length,
+            PRODUCT_PREFIX,
+            product_names,
+            LENGTH_8,
+            amounts,
+            LENGTH_4,
+            quantities,
+            LENGTH_8,
+            timestamps,
+        ]
+        # Refunded and not refunded items are encoded separately,
+        # since refunded_at is NULL for the latter.
+        buf = pack_rows(fields + [LENGTH_8, refund_times], refund_flags) + pack_rows(
+            fields + [NULL], ~refund_flags
+        )
 
-    elapsed = time.time() - start
-    return {"table": "orders", "rows": loaded, "elapsed": elapsed}
+        yield batch_count, buf
 
 
 def load_order_items(
     conninfo: str, total: int, max_order_id: int, batch_size: int = 100_000
 ) -> dict:
     """Load order_items table using COPY."""
-    start = time.time()
-    loaded = 0
-
-    with psycopg.connect(conninfo) as conn:
-        with conn.cursor() as cur:
-            with cur.copy(
-                "COPY copy_data.order_items (id, user_id, tenant_id, order_id, product_name, amount, quantity, created_at, refunded_at) FROM STDIN"
-            ) as copy:
-                for batch_start in range(0, total, batch_size):
-                    batch_end = min(batch_start + batch_size, total)
-                    batch_count = batch_end - batch_start
-
-                    user_ids = np.random.randint(1, 5_000_001, batch_count)
-                    tenant_ids = np.random.randint(1, 1001, batch_count)
-                    order_ids = np.random.randint(1, max_order_id + 1, batch_count)
-                    amounts = np.round(5 + np.random.random(batch_count) * 195, 2)
-                    quantities = np.random.randint(1, 6, batch_count)
-                    timestamps = random_timestamps(batch_count)
-                    refund_flags = np.random.random(batch_count) < 0.05
-                    refund_times = random_timestamps(batch_count, 365)
-                    product_names = random_texts_numpy(batch_count, 30)
-
-                    for i, idx in enumerate(range(batch_start + 1, batch_end + 1)):
-                        refunded_at = refund_times[i] if refund_flags[i] else None
-                        copy.write_row(
-                            (
-                                idx,
-                                int(user_ids[i]),
-                                int(tenant_ids[i]),
-                                int(order_ids[i]),
-                                f"Product {product_names[i]}",
-                                float(amounts[i]),
-                                int(quantities[i]),
-                                timestamps[i],
-                                refunded_at,
-                            )
-                        )
-
-                    loaded = batch_end
-                    elapsed = time.time() - start
-                    rate = loaded / elapsed if elapsed > 0 else 0
-                    print(
-                        f"  order_items: {loaded:,}/{total:,} ({100*loaded/total:.1f}%) - {rate:,.0f} rows/s"
-                    )
-
-        conn.commit()
-
-    elapsed = time.time() - start
-    return {"table": "order_items", "rows": loaded, "elapsed": elapsed}
+    return copy_batches(
+        conninfo,
+        "order_items",
+        "id, user_id, tenant_id, order_id, product_name, amount, quantity, created_at, refunded_at",
+        total,
+        order_items_batches(total, max_order_id, batch_size),
+    )
 
 
-def load_log_actions(conninfo: str, total: int, batch_size: int = 500_000) -> dict:
-    """Load log_actions table using COPY."""
-    start = time.time()
-    loaded = 0
+def log_actions_batches(
+    first: int, last: int, batch_size: int
+) -> Generator[Batch, None, None]:
+    rng = np.random.default_rng()
+    now = pg_now()
 
     actions = [
-        "login",
-        "logout",
-        "click",
-        "purchase",
-        "view",
-        "error",
-        "search",
-        "update",
-        "delete",
-        "create",
+        b"login",
+        b"logout",
+        b"click",
+        b"purchase",
+        b"view",
+        b"error",
+        b"search",
+        b"update",
+        b"delete",
+        b"create",
     ]
 
-    with psycopg.connect(conninfo) as conn:
-        with conn.cursor() as cur:
-            with cur.copy(
-                "COPY copy_data.log_actions (id, tenant_id, user_id, action, details, ip_address, user_agent, created_at) FROM STDIN"
-            ) as copy:
-                for batch_start in range(0, total, batch_size):
-                    batch_end = min(batch_start + batch_size, total)
-                    batch_count = batch_end - batch_start
-
-                    tenant_null_flags = np.random.random(batch_count) < 0.1
-                    tenant_ids = np.random.randint(1, 1001, batch_count)
-                    user_ids = np.random.randint(1, 5_000_001, batch_count)
-                    action_indices = np.random.randint(0, len(actions), batch_count)
-                    timestamps = random_timestamps(batch_count)
-                    details = random_texts_numpy(batch_count, 50)
-                    user_agents = random_texts_numpy(batch_count, 30)
-                    ip_parts = np.random.randint(0, 256, (batch_count, 4))
-
-                    for i, idx in enumerate(range(batch_start + 1, batch_end + 1)):
-                        tenant_id = None if tenant_null_flags[i] else int(tenant_ids[i])
-                        ip = f"{ip_parts[i,0]}.{ip_parts[i,1]}.{ip_parts[i,2]}.{ip_parts[i,3]}"
-                        copy.write_row(
-                            (
-                                idx,
-                                tenant_id,
-                                int(user_ids[i]),
-                                actions[action_indices[i]],
-                                details[i],
-                                ip,
-                                f"Mozilla/5.0 {user_agents[i]}",
-                                timestamps[i],
-                            )
-                        )
+    for batch_start in range(first, last, batch_size):
+        batch_end = min(batch_start + batch_size, last)
+        batch_count = batch_end - batch_start
+
+        tenant_null_flags = (rng.random(batch_count) < 0.1).tolist()
+        tenant_ids = rng.integers(1, 1001, batch_count).tolist()
+        user_ids = rng.integers(1, 5_000_001, batch_count).tolist()
+        action_indices = rng.integers(0, len(actions), batch_count).tolist()
+        timestamps = random_timestamps(rng, batch_count, now).tolist()
+        details = random_texts_numpy(rng, batch_count, 50)
+        user_agents = random_texts_numpy(rng, batch_count, 30)
+        ip_parts = rng.integers(0, 256, (batch_count, 4)).astype("S3")
+        ips = ip_parts[:, 0]
+        for octet in range(1, 4):
+            ips = np.char.add(np.char.add(ips, b"."), ip_parts[:, octet])
+        ips = ips.tolist()
+
+        buf = bytearray()
+        for i, idx in enumerate(range(batch_start + 1, batch_end + 1)):
+            tenant_id = None if tenant_null_flags[i] else tenant_ids[i]
+            buf += LOG_ACTIONS_ROW.pack(8, 8, idx)
+            encode_int8(buf, tenant_id)
+            encode_int8(buf, user_ids[i])
+            encode_bytes(buf, actions[action_indices[i]])
+            encode_bytes(buf, details[i])
+            encode_bytes(buf, ips[i])
+            encode_prefixed(buf, USER_AGENT_PREFIX, user_agents[i])
+            encode_timestamptz(buf, timestamps[i])
+
+        yield batch_count, buf
+
+
+def load_log_actions(
+    conninfo: str, total: int, shard: int, shards: int, batch_size: int = 500_000
+) -> dict:
+    """Load one shard of the log_actions table using COPY.
+
+    log_actions is by far the largest table, so it's split into id ranges
+    loaded concurrently by separate workers.
+    """
+    chunk = -(-total // shards)
+    first = min(shard * chunk, total)
+    last = min(first + chunk, total)
+    return copy_batches(
+        conninfo,
+        "log_actions",
+        "id, tenant_id, user_id, action, details, ip_address, user_agent, created_at",
+        last - first,
+        log_actions_batches(first, last, batch_size),
+        name=f"log_actions_{shard}",
+    )
 
-                    loaded = batch_end
-                    elapsed = time.time() - start
-                    rate = loaded / elapsed if elapsed > 0 else 0
-                    print(
-                        f"  log_actions: {loaded:,}/{total:,} ({100*loaded/total:.1f}%) - {rate:,.0f} rows/s"
-                    )
 
-        conn.commit()
+def with_identity_batches(total: int, batch_size: int) -> Generator[Batch, None, None]:
+    rng = np.random.default_rng()
+    field_count = FIELD_COUNT.pack(2)
+    data_length = FIELD_LENGTH.pack(20)
 
-    elapsed = time.time() - start
-    return {"table": "log_actions", "rows": loaded, "elapsed": elapsed}
+    for batch_start in range(0, total, batch_size):
+        batch_end = min(batch_start + batch_size, total)
+        batch_count = batch_end - batch_start
 
+        tenant_ids = rng.integers(1, 1001, batch_count).astype(">i8")
+        data = random_text_array(rng, batch_count, 20)
 
-def load_with_identity(conninfo: str, total: int, batch_size: int = 100_000) -> dict:
-    """Load with_identity table using COPY."""
-    start = time.time()
-    loaded = 0
+        buf = pack_rows([field_count, LENGTH_8, tenant_ids, data_length, data])
 
-    with psycopg.connect(conninfo) as conn:
-        with conn.cursor() as cur:
-            # For GENERATED ALWAYS AS IDENTITY, we use DEFAULT
-            with cur.copy(
-                "COPY copy_data.with_identity (tenant_id, data) FROM STDIN"
-            ) as copy:
-                for batch_start in range(0, total, batch_size):
-                    batch_end = min(batch_start + batch_size, total)
-                    batch_count = batch_end - batch_start
-
-                    tenant_ids = np.random.randint(1, 1001, batch_count)
-                    data = random_texts_numpy(batch_count, 20)
-
-                    for i in range(batch_count):
-                        copy.write_row((int(tenant_ids[i]), data[i]))
-
-                    loaded = batch_end
-                    elapsed = time.time() - start
-                    rate = loaded / elapsed if elapsed > 0 else 0
-                    print(
-                        f"  with_identity: {loaded:,}/{total:,} ({100*loaded/total:.1f}%) - {rate:,.0f} rows/s"
-                    )
+        yield batch_count, buf
 
-        conn.commit()
 
-    elapsed = time.time() - start
-    return {"table": "with_identity", "rows": loaded, "elapsed": elapsed}
+def load_with_identity(conninfo: str, total: int, batch_size: int = 100_000) -> dict:
+    """Load with_identity table using COPY."""
+    # For GENERATED ALWAYS AS IDENTITY, we use DEFAULT
+    return copy_batches(
+        conninfo,
+        "with_identity",
+        "tenant_id, data",
+        total,
+        with_identity_batches(total, batch_size),
+    )
 
 
 def create_indexes(conninfo: str):
@@ -394,18 +631,19 @@ def create_indexes(conninfo: str):
     start = time.time()
 
     with psycopg.connect(conninfo) as conn:
-        conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_orders_user_tenant ON copy_data.orders(user_id, tenant_id)"
-        )
-        conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_order_items_order ON copy_data.order_items(order_id)"
-        )
-        conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_log_actions_tenant ON copy_data.log_actions(tenant_id)"
-        )
-        conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_log_actions_created ON copy_data.log_actions(created_at)"
-        )
+        with conn.pipeline():
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_orders_user_tenant ON copy_data.orders(user_id, tenant_id)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_order_items_order ON copy_data.order_items(order_id)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_log_actions_tenant ON copy_data.log_actions(tenant_id)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_log_actions_created ON copy_data.log_actions(created_at)"
+            )
         conn.commit()
 
     print(f"Indexes created in {format_duration(time.time() - start)}")
@@ -417,11 +655,12 @@ def analyze_tables(conninfo: str):
     start = time.time()
 
     with psycopg.connect(conninfo) as conn:
-        conn.execute("ANALYZE copy_data.users")
-        conn.execute("ANALYZE copy_data.orders")
-        conn.execute("ANALYZE copy_data.order_items")
-        conn.execute("ANALYZE copy_data.log_actions")
-        conn.execute("ANALYZE copy_data.with_identity")
+        with conn.pipeline():
+            conn.execute("ANALYZE copy_data.users")
+            conn.execute("ANALYZE copy_data.orders")
+            conn.execute("ANALYZE copy_data.order_items")
+            conn.execute("ANALYZE copy_data.log_actions")
+            conn.execute("ANALYZE copy_data.with_identity")
         conn.commit()
 
     print(f"Analyze completed in {format_duration(time.time() - start)}")
@@ -514,45 +753,70 @@ def main():
     print("\nLoading data...")
     results = []
 
-    # Users and orders can run in parallel
-    # Order items depends on orders (for valid order_ids)
-    # Log actions and with_identity are independent
-
-    with ProcessPoolExecutor(max_workers=args.parallel) as executor:
-        futures = {}
-
-        # Phase 1: users and orders in parallel
-        futures[executor.submit(load_users, args.conninfo, users_count)] = "users"
-        futures[executor.submit(load_orders, args.conninfo, orders_count)] = "orders"
-
-        # Wait for orders to complete before starting order_items
-        for future in as_completed(futures):
-            result = future.result()
-            results.append(result)
-            print(
-                f"  {result['table']} completed: {result['rows']:,} rows in {format_duration(result['elapsed'])}"
+    # Users partitions, orders, log actions and with_identity are independent
+    # Order items depends on orders (for valid order_ids), so it starts
+    # as soon as orders finishes, without waiting for anything else.
+    # Loaders are only submitted when a worker is free, so order_items
+    # jumps ahead of the log_actions shards still waiting for one.
+    ready = deque(
+        [("orders", load_orders, args.conninfo, orders_count)]
+        + [
+            (f"users_{partition}", load_users, args.conninfo, users_count, partition)
+            for partition in range(USERS_PARTITIONS)
+        ]
+        + [("with_identity", load_with_identity, args.conninfo, with_identity_count)]
+        + [
+            (
+                f"log_actions_{shard}",
+                load_log_actions,
+                args.conninfo,
+                log_actions_count,
+                shard,
+                args.parallel,
             )
+            for shard in range(args.parallel)
+        ]
+    )
+
+    # Forked workers inherit the already imported numpy and psycopg
+    # instead of importing them again.
+    mp_context = get_context("fork") if sys.platform == "linux" else None
 
-        # Phase 2: order_items, log_actions, with_identity in parallel
+    with ProcessPoolExecutor(
+        max_workers=args.parallel, mp_context=mp_context
+    ) as executor:
         futures = {}
-        futures[
-            executor.submit(
-                load_order_items, args.conninfo, order_items_count, orders_count
-            )
-        ] = "order_items"
-        futures[
-            executor.submit(load_log_actions, args.conninfo, log_actions_count)
-        ] = "log_actions"
-        futures[
-            executor.submit(load_with_identity, args.conninfo, with_identity_count)
-        ] = "with_identity"
-
-        for future in as_completed(futures):
-            result = future.result()
-            results.append(result)
-            print(
-                f"  {result['table']} completed: {result['rows']:,} rows in {format_duration(result['elapsed'])}"
-            )
+        pending = set()
+
+        def submit_ready():
+            while ready and len(pending) < args.parallel:
+                name, loader, *loader_args = ready.popleft()
+                future = executor.submit(loader, *loader_args)
+                futures[future] = name
+                pending.add(future)
+
+        submit_ready()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            pending -= done
+            for future in done:
+                result = future.result()
+                results.append(result)
+                print(
+                    f"  {result['table']} completed: {result['rows']:,} rows in {format_duration(result['elapsed'])}"
+                )
+
+                if futures[future] == "orders":
+                    ready.appendleft(
+                        (
+                            "order_items",
+                            load_order_items,
+                            args.conninfo,
+                            order_items_count,
+                            orders_count,
+                        )
+                    )
+            submit_ready()
 
     # Create indexes
     if not args.skip_indexes:
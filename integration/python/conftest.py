@@ -0,0 +1,67 @@
+import asyncio
+import secrets
+
+import pytest_asyncio
+from globals import admin, normal_async_pool, sharded_async_pool
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def pools():
+    """Connection pools shared by the whole test session: normal, then sharded."""
+    pools = [await normal_async_pool(), await sharded_async_pool()]
+
+    yield pools
+
+    for pool in pools:
+        await pool.close()
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="session")
+async def schema(pools, schema_table):
+    """A random schema holding the module's schema_table, on both databases.
+
+    Modules using it define a schema_table fixture returning the table name
+    and its CREATE TABLE statement.
+    """
+    schema = secrets.token_hex(3).upper()[:5]
+    _, create_table = schema_table
+
+    async def create(pool):
+        async with pool.acquire() as conn:
+            await conn.execute(f'CREATE SCHEMA IF NOT EXISTS "{schema}"')
+            await conn.execute(f'SET search_path TO "{schema}",public')
+            await conn.execute(create_table)
+
+    await asyncio.gather(*[create(pool) for pool in pools])
+
+    yield schema
+
+    admin_conn = admin()
+    _ = admin_conn.execute("RECONNECT")  # Remove lock on schema
+
+    await asyncio.gather(
+        *[pool.execute(f'DROP SCHEMA "{schema}" CASCADE') for pool in pools]
+    )
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def conns(pools, schema, schema_table):
+    """One connection from each pool, searching the module's schema first."""
+    table, _ = schema_table
+    conns = [await pool.acquire() for pool in pools]
+    await asyncio.gather(
+        *[conn.execute(f'SET search_path TO "{schema}",public') for conn in conns]
+    )
+
+    yield conns
+
+    try:
+        for conn in conns:
+            await conn.execute(f"TRUNCATE {table}")
+    except Exception as e:
+        # Only allow this not to work if we broke the connection intentionally
+        # with a test.
+        assert "connection is closed" in str(e)
+    finally:
+        for pool, conn in zip(pools, conns):
+            await pool.release(conn)
@@ -1,24 +1,43 @@
+import atexit
+
 import psycopg
 import asyncpg
 
+# Admin connection shared by every caller in this process.
+_ADMIN = None
+
 
 def admin():
-    conn = psycopg.connect(
-        "dbname=admin user=admin password=pgdog host=127.0.0.1 port=6432"
-    )
-    conn.autocommit = True
-    return conn
+    global _ADMIN
+    if _ADMIN is None or _ADMIN.closed:
+        _ADMIN = psycopg.connect(
+            "dbname=admin user=admin password=pgdog host=127.0.0.1 port=6432"
+        )
+        _ADMIN.autocommit = True
+    return _ADMIN
+
+
+@atexit.register
+def _close_admin():
+    if _ADMIN is not None:
+        _ADMIN.close()
+
+
+# Position of out_of_sync in SHOW POOLS, looked up on first use.
+_OUT_OF_SYNC_IDX = None
 
 
 def no_out_of_sync():
+    global _OUT_OF_SYNC_IDX
     conn = admin()
     cur = conn.cursor()
     cur.execute("SHOW POOLS;")
-    column_names = [desc[0] for desc in cur.description]
-    out_of_sync_idx = column_names.index("out_of_sync")
+    if _OUT_OF_SYNC_IDX is None:
+        column_names = [desc[0] for desc in cur.description]
+        _OUT_OF_SYNC_IDX = column_names.index("out_of_sync")
     pools = cur.fetchall()
     for pool in pools:
-        assert pool[out_of_sync_idx] == 0
+        assert pool[_OUT_OF_SYNC_IDX] == 0
 
 
 def sharded_sync():
@@ -50,7 +69,7 @@ async def sharded_async():
         database="pgdog_sharded",
         host="127.0.0.1",
         port=6432,
-        statement_cache_size=250,
+        statement_cache_size=1024,
     )
 
 
@@ -61,7 +80,7 @@ async def normal_async():
         database="pgdog",
         host="127.0.0.1",
         port=6432,
-        statement_cache_size=250,
+        statement_cache_size=1024,
     )
 
 async def schema_sharded_async():
@@ -71,5 +90,31 @@ async def schema_sharded_async():
         database="pgdog_schema",
         host="127.0.0.1",
         port=6432,
-        statement_cache_size=250
+        statement_cache_size=1024
+    )
+
+
+async def sharded_async_pool():
+    return await asyncpg.create_pool(
+        user="pgdog",
+        password="pgdog",
+        database="pgdog_sharded",
+        host="127.0.0.1",
+        port=6432,
+        statement_cache_size=1024,
+        min_size=2,
+        max_size=4,
+    )
+
+
+async def normal_async_pool():
+    return await asyncpg.create_pool(
+        user="pgdog",
+        password="pgdog",
+        database="pgdog",
+        host="127.0.0.1",
+        port=6432,
+        statement_cache_size=1024,
+        min_size=2,
+        max_size=4,
     )
@@ -1,5 +1,5 @@
+import asyncio
 import random
-import string
 from datetime import datetime
 from io import BytesIO
 
@@ -11,99 +11,72 @@ from globals import (
     no_out_of_sync,
     normal_async,
     schema_sharded_async,
-    sharded_async,
 )
 
 
-@pytest_asyncio.fixture
-async def conns():
-    schema = "".join(
-        random.choice(string.ascii_uppercase + string.digits) for _ in range(5)
-    )
-    conns = await both()
-    for conn in conns:
-        await setup(conn, schema)
-
-    yield conns
-
-    admin_conn = admin()
-    _ = admin_conn.execute("RECONNECT")  # Remove lock on schema
-
-    try:
-        for conn in conns:
-            await conn.execute(f'DROP SCHEMA "{schema}" CASCADE')
-    except Exception as e:
-        # Only allow this not to work if we broke the connection intentionally
-        # with a test.
-        assert "connection is closed" in str(e)
-
-
-async def both():
-    return [await normal_async(), await sharded_async()]
-
-
-async def setup(conn, schema):
-    await conn.execute(f'CREATE SCHEMA IF NOT EXISTS "{schema}"')
-    await conn.execute(f'SET search_path TO "{schema}",public')
-    try:
-        await conn.execute("DROP TABLE IF EXISTS sharded")
-    except asyncpg.exceptions.UndefinedTableError:
-        pass
-    await conn.execute(
+@pytest.fixture(scope="module")
+def schema_table():
+    """Table the schema fixture in conftest.py creates for this module."""
+    return (
+        "sharded",
         """CREATE TABLE sharded (
         id BIGINT PRIMARY KEY,
         value TEXT,
         created_at TIMESTAMPTZ
-    )"""
+    )""",
     )
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 async def test_connect(conns):
-    for c in conns:
-        result = await c.fetch("SELECT 1")
-        assert result[0][0] == 1
+    async def run(c):
+        assert await c.fetchval("SELECT 1") == 1
+
+    await asyncio.gather(*[run(c) for c in conns])
 
     conn = await normal_async()
-    result = await conn.fetch("SELECT 1")
-    assert result[0][0] == 1
+    assert await conn.fetchval("SELECT 1") == 1
     no_out_of_sync()
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 async def test_multiple_queries(conns):
-    for c in conns:
+    async def run(c):
         try:
             await c.fetch("SELECT 1;SELECT 2;")
         except asyncpg.exceptions.PostgresSyntaxError as e:
             assert str(e) == "cannot insert multiple commands into a prepared statement"
 
+    await asyncio.gather(*[run(c) for c in conns])
 
-@pytest.mark.asyncio
+
+@pytest.mark.asyncio(loop_scope="session")
 async def test_transaction(conns):
     for c in conns:
+        stmt = await c.prepare("SELECT $1::int")
         for j in range(50):
             async with c.transaction():
                 for i in range(25):
-                    result = await c.fetch("SELECT $1::int", i * j)
-                    assert result[0][0] == i * j
+                    assert await stmt.fetchval(i * j) == i * j
     no_out_of_sync()
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 async def test_error(conns):
-    for c in conns:
+    async def run_errors(c):
         for _ in range(250):
             try:
                 await c.execute("SELECT sdfsf")
             except asyncpg.exceptions.UndefinedColumnError:
                 pass
+
+    await asyncio.gather(*[run_errors(c) for c in conns])
     no_out_of_sync()
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 async def test_error_transaction(conns):
-    for c in conns:
+    async def run_errors(c):
         for _ in range(250):
             async with c.transaction():
                 try:
@@ -111,10 +84,12 @@ async def test_error_transaction(conns):
                 except asyncpg.exceptions.UndefinedColumnError:
                     pass
             await c.execute("SELECT 1")
+
+    await asyncio.gather(*[run_errors(c) for c in conns])
     no_out_of_sync()
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 async def test_insert_omnishard(conns):
     conn = conns[1]
     try:
@@ -130,128 +105,125 @@ async def test_insert_omnishard(conns):
             )
     except asyncpg.exceptions.DuplicateTableError:
         pass
+    ones = [f"one_{i}" for i in range(250)]
     async with conn.transaction():
-        for i in range(250):
+        for i, one in enumerate(ones):
             result = await conn.fetch(
                 """
                 INSERT INTO pytest (id, one, two, three, four) VALUES($1, $2, NOW(), $3, $4)
                 RETURNING *
                 """,
                 i,
-                f"one_{i}",
+                one,
                 i * 25.0,
                 i * 50.0,
             )
             for shard in range(1):
                 assert result[shard][0] == i
-                assert result[shard][1] == f"one_{i}"
+                assert result[shard][1] == one
                 assert result[shard][3] == i * 25.0
                 assert result[shard][4] == i * 50.0
     await conn.execute("DROP TABLE pytest")
     no_out_of_sync()
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 async def test_bigint_binary(conns):
     big_value = 1 << 62
-    for conn in conns:
+
+    async def run(conn):
         await conn.execute("DROP TABLE IF EXISTS binary_bigint")
         await conn.execute("CREATE TABLE binary_bigint (id BIGINT)")
         await conn.execute("INSERT INTO binary_bigint (id) VALUES($1)", big_value)
         row = await conn.fetchrow("SELECT id FROM binary_bigint")
         assert row["id"] == big_value
         await conn.execute("DROP TABLE binary_bigint")
+
+    await asyncio.gather(*[run(conn) for conn in conns])
     no_out_of_sync()
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 async def test_int_array_binary(conns):
     values = [1, 2, 3]
-    for conn in conns:
+
+    async def run(conn):
         await conn.execute("DROP TABLE IF EXISTS binary_array")
         await conn.execute("CREATE TABLE binary_array (vals INT[])")
         await conn.execute("INSERT INTO binary_array (vals) VALUES($1)", values)
         row = await conn.fetchrow("SELECT vals FROM binary_array")
         assert row["vals"] == values
         await conn.execute("DROP TABLE binary_array")
+
+    await asyncio.gather(*[run(conn) for conn in conns])
     no_out_of_sync()
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 async def test_direct_shard(conns):
     conn = conns[1]
-    try:
-        await conn.execute("DROP TABLE sharded")
-    except asyncpg.exceptions.UndefinedTableError:
-        pass
-    await conn.execute(
-        """CREATE TABLE sharded (
-        id BIGINT,
-        value TEXT,
-        created_at TIMESTAMPTZ
-    )"""
+    # Every statement carries a single id, so pgdog has to route it to one shard.
+    insert = await conn.prepare(
+        """INSERT INTO sharded (
+            id,
+            value,
+            created_at
+        ) VALUES ($1, $2, NOW()) RETURNING *"""
+    )
+    select = await conn.prepare("SELECT * FROM sharded WHERE id = $1")
+    update = await conn.prepare(
+        "UPDATE sharded SET value = $1 WHERE id = $2 RETURNING *"
     )
-    await conn.execute("TRUNCATE TABLE sharded")
+    delete = await conn.prepare("DELETE FROM sharded WHERE id = $1")
 
     for r in [100_000, 4_000_000_000_000]:
         for id in range(r, r + 250):
-            result = await conn.fetch(
-                """
-                INSERT INTO sharded (
-                    id,
-                    value,
-                    created_at
-                ) VALUES ($1, $2, NOW()) RETURNING *""",
-                id,
-                f"value_{id}",
-            )
+            result = await insert.fetch(id, f"value_{id}")
             assert len(result) == 1
             assert result[0][0] == id
             assert result[0][1] == f"value_{id}"
 
-            result = await conn.fetch("""SELECT * FROM sharded WHERE id = $1""", id)
+            result = await select.fetch(id)
             assert len(result) == 1
             assert result[0][0] == id
             assert result[0][1] == f"value_{id}"
 
-            result = await conn.fetch(
-                """UPDATE sharded SET value = $1 WHERE id = $2 RETURNING *""",
-                f"value_{id + 1}",
-                id,
-            )
+            result = await update.fetch(f"value_{id + 1}", id)
             assert len(result) == 1
             assert result[0][0] == id
             assert result[0][1] == f"value_{id + 1}"
 
-            await conn.execute("""DELETE FROM sharded WHERE id = $1""", id)
-            result = await conn.fetch("""SELECT * FROM sharded WHERE id = $1""", id)
+            await delete.fetch(id)
+            result = await select.fetch(id)
             assert len(result) == 0
     no_out_of_sync()
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 async def test_delete(conns):
     conn = conns[1]
 
+    delete = await conn.prepare("DELETE FROM sharded WHERE id = $1")
     for id in range(250):
-        await conn.execute("DELETE FROM sharded WHERE id = $1", id)
+        await delete.fetch(id)
 
     no_out_of_sync()
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 async def test_copy(conns):
     records = 250
-    for i in range(50):
-        for conn in conns:
+    now = datetime.now()
+    rows = [[x, f"value_{x}", now] for x in range(records)]
+
+    async def run(conn):
+        for i in range(50):
             # Test COPY FROM (TO table)
-            rows = [[x, f"value_{x}", datetime.now()] for x in range(records)]
             await conn.copy_records_to_table(
                 "sharded", records=rows, columns=["id", "value", "created_at"]
             )
-            count = await conn.fetch("SELECT COUNT(*) FROM sharded")
-            assert len(count) == 1
-            assert count[0][0] == records
+            count = await conn.fetchval("SELECT COUNT(*) FROM sharded")
+            assert count == records
 
             # Test COPY TO STDOUT
             buffer = BytesIO()
@@ -266,8 +238,10 @@ async def test_copy(conns):
 
             await conn.execute("DELETE FROM sharded")
 
+    await asyncio.gather(*[run(conn) for conn in conns])
 
-@pytest.mark.asyncio
+
+@pytest.mark.asyncio(loop_scope="session")
 async def test_execute_many(conns):
     # These IDs are generated assuming there are TWO shards only.
     # Total hack.
@@ -287,16 +261,21 @@ async def test_execute_many(conns):
         2245430240240759095,
         6530381198398044927,
     ]
+
+    values = [[x, f"value_{x}"] for x in shard_0_ids]
+
     # This will not blow up, because we are connected to one shard.
-    for conn in conns:
-        values = [[x, f"value_{x}"] for x in shard_0_ids]
-        rows = await conn.fetchmany(
-            "INSERT INTO sharded (id, value) VALUES ($1, $2) RETURNING *", values
+    async def run(conn):
+        insert = await conn.prepare(
+            "INSERT INTO sharded (id, value) VALUES ($1, $2) RETURNING *"
         )
+        rows = await insert.fetchmany(values)
         assert len(rows) == len(shard_0_ids)
 
+    await asyncio.gather(*[run(conn) for conn in conns])
 
-@pytest.mark.asyncio
+
+@pytest.mark.asyncio(loop_scope="session")
 async def test_execute_many_cross_shard(conns):
     #
     # This WON'T work for multi-shard queries.
@@ -323,57 +302,65 @@ async def test_execute_many_cross_shard(conns):
 
 @pytest.mark.asyncio
 async def test_stress():
-    for _ in range(100):
-        # Reconnect
-        normal = await normal_async()
-        try:
-            await normal.execute("SET search_path TO '$user', public")
-            num = random.randint(1, 1_000_000)
-            # assert not await in_transaction(normal)
-            await normal.execute("DROP TABLE IF EXISTS test_stress")
-            # await not_in_transaction(normal)
-            await normal.execute("CREATE TABLE test_stress (id BIGINT)")
-            # await not_in_transaction(normal)
-            result = await normal.fetch(
-                "INSERT INTO test_stress VALUES ($1) RETURNING *", num
-            )
-            assert result[0][0] == num
+    # Bound how many of the 100 connect/DDL/query cycles hit pgdog at once.
+    sem = asyncio.Semaphore(10)
+
+    async def one(i):
+        table = f"test_stress_{i}"
+        async with sem:
+            # Reconnect
+            normal = await normal_async()
+            try:
+                await normal.execute("SET search_path TO '$user', public")
+                num = random.randint(1, 1_000_000)
+                # assert not await in_transaction(normal)
+                await normal.execute(f"DROP TABLE IF EXISTS {table}")
+                # await not_in_transaction(normal)
+                await normal.execute(f"CREATE TABLE {table} (id BIGINT)")
+                # await not_in_transaction(normal)
+                result = await normal.fetchval(
+                    f"INSERT INTO {table} VALUES ($1) RETURNING *", num
+                )
+                assert result == num
+
+                # await not_in_transaction(normal)
+                result = await normal.fetchval(
+                    f"SELECT * FROM {table} WHERE id = $1", num
+                )
+                assert result == num
 
-            # await not_in_transaction(normal)
-            result = await normal.fetch("SELECT * FROM test_stress WHERE id = $1", num)
-            assert result[0][0] == num
+                # await not_in_transaction(normal)
+                await normal.fetch(f"TRUNCATE {table}")
 
-            # await not_in_transaction(normal)
-            await normal.fetch("TRUNCATE test_stress")
+                # await not_in_transaction(normal)
+                assert await normal.fetchval(f"SELECT COUNT(*) FROM {table}") == 0
 
-            # await not_in_transaction(normal)
-            assert (await normal.fetch("SELECT COUNT(*) FROM test_stress"))[0][0] == 0
+                select_one = await normal.prepare("SELECT 1")
+                for _ in range(50):
+                    await select_one.fetchval()
 
-            for _ in range(50):
-                await normal.execute("SELECT 1")
+                # await not_in_transaction(normal)
+                await normal.execute(f"DROP TABLE {table}")
+            finally:
+                await normal.close()
 
-            # await not_in_transaction(normal)
-            await normal.execute("DROP TABLE test_stress")
-        finally:
-            await normal.close()
+    await asyncio.gather(*[one(i) for i in range(100)])
 
 
 async def in_transaction(conn):
     await conn.fetch("SELECT now() != statement_timestamp()")
 
 
-@pytest.mark.asyncio
-async def test_timestamp_sorting_binary_format():
+@pytest.mark.asyncio(loop_scope="session")
+async def test_timestamp_sorting_binary_format(pools):
     """Test timestamp sorting with binary format."""
     from datetime import datetime, timedelta, timezone
 
-    conn = await sharded_async()
+    pool = pools[1]
+    conn = await pool.acquire()
 
     try:
-        try:
-            await conn.execute("DROP TABLE IF EXISTS timestamp_test CASCADE")
-        except asyncpg.exceptions.UndefinedTableError:
-            pass
+        await conn.execute("DROP TABLE IF EXISTS timestamp_test CASCADE")
 
         await conn.execute("""
             CREATE TABLE timestamp_test (
@@ -393,13 +380,9 @@ async def test_timestamp_sorting_binary_format():
             (103, "Far future", base_time + timedelta(days=10)),
         ]
 
-        for id_val, name, ts in test_data:
-            await conn.execute(
-                "INSERT INTO timestamp_test (id, name, ts) VALUES ($1, $2, $3)",
-                id_val,
-                name,
-                ts,
-            )
+        await conn.copy_records_to_table(
+            "timestamp_test", records=test_data, columns=["id", "name", "ts"]
+        )
 
         rows = await conn.fetch(
             "SELECT id, name, ts FROM timestamp_test ORDER BY ts DESC"
@@ -423,15 +406,16 @@ async def test_timestamp_sorting_binary_format():
         )
 
     finally:
-        await conn.close()
+        await pool.release(conn)
 
 
-@pytest.mark.asyncio
-async def test_copy_jsonb():
+@pytest.mark.asyncio(loop_scope="session")
+async def test_copy_jsonb(pools):
     """Test COPY with JSONB column."""
     import json
 
-    conn = await normal_async()
+    pool = pools[0]
+    conn = await pool.acquire()
 
     try:
         await conn.execute("DROP TABLE IF EXISTS jsonb_copy_test")
@@ -444,12 +428,7 @@ async def test_copy_jsonb():
         """)
 
         test_data = [
-            [
-                1,
-                json.dumps(
-                    {"name": "Alice", "age": 30, "active": True}, sort_keys=True
-                ),
-            ],
+            [1, json.dumps({"name": "Alice", "age": 30, "active": True})],
             [
                 2,
                 json.dumps(
@@ -457,8 +436,7 @@ async def test_copy_jsonb():
                         "name": "Bob",
                         "scores": [95, 87, 92],
                         "metadata": {"region": "US"},
-                    },
-                    sort_keys=True,
+                    }
                 ),
             ],
             [
@@ -469,52 +447,55 @@ async def test_copy_jsonb():
                             {"id": 1, "price": 29.99},
                             {"id": 2, "price": 15.50},
                         ]
-                    },
-                    sort_keys=True,
+                    }
                 ),
             ],
             [4, json.dumps(None)],
-            [
-                5,
-                json.dumps({"empty": {}, "list": [], "string": "test"}, sort_keys=True),
-            ],
+            [5, json.dumps({"empty": {}, "list": [], "string": "test"})],
         ]
 
         await conn.copy_records_to_table(
             "jsonb_copy_test", records=test_data, columns=["id", "data"]
         )
 
-        result = await conn.fetch("SELECT COUNT(*) FROM jsonb_copy_test")
-        assert result[0][0] == 5
+        assert await conn.fetchval("SELECT COUNT(*) FROM jsonb_copy_test") == 5
 
         rows = await conn.fetch("SELECT id, data FROM jsonb_copy_test ORDER BY id")
 
+        expected = [json.loads(data) for _, data in test_data]
         for i, row in enumerate(rows):
-            expected = json.loads(test_data[i][1])
-            got = json.loads(row[1])
-            assert json.dumps(got, sort_keys=True) == json.dumps(
-                expected, sort_keys=True
-            )
+            assert json.loads(row[1]) == expected[i]
 
     finally:
-        await conn.execute("DROP TABLE IF EXISTS jsonb_copy_test")
-        await conn.close()
+        try:
+            await conn.execute("DROP TABLE IF EXISTS jsonb_copy_test")
+        finally:
+            await pool.release(conn)
 
 
-@pytest.mark.asyncio
-async def test_schema_sharding():
+@pytest_asyncio.fixture(scope="module", loop_scope="session")
+async def shard_schemas():
+    conn = await schema_sharded_async()
+    for schema in ["shard_0", "shard_1"]:
+        await conn.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+        await conn.execute(f"CREATE SCHEMA {schema}")
+        await conn.execute(
+            f"CREATE TABLE {schema}.test(id BIGINT, created_at TIMESTAMPTZ DEFAULT NOW())"
+        )
+
+    yield
+
+    await conn.close()
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_schema_sharding(shard_schemas):
     admin().cursor().execute("SET cross_shard_disabled TO true")
     conn = await schema_sharded_async()
 
     for _ in range(25):
-        for schema in ["shard_0", "shard_1"]:
-            await conn.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
-            await conn.execute(f"CREATE SCHEMA {schema}")
         for shard in [0, 1]:
             schema = f"shard_{shard}"
-            await conn.execute(
-                f"CREATE TABLE {schema}.test(id BIGINT, created_at TIMESTAMPTZ DEFAULT NOW())"
-            )
             await conn.fetch(f"SELECT * FROM {schema}.test WHERE id = $1", 1)
 
             insert = await conn.fetch(
@@ -539,22 +520,19 @@ async def test_schema_sharding():
     admin().cursor().execute("SET cross_shard_disabled TO false")
 
 
-@pytest.mark.asyncio
-async def test_schema_sharding_transactions():
+@pytest.mark.asyncio(loop_scope="session")
+async def test_schema_sharding_transactions(shard_schemas):
     admin().cursor().execute("SET cross_shard_disabled TO true")
     conn = await schema_sharded_async()
 
     for _ in range(25):
-        for schema in ["shard_0", "shard_1"]:
-            await conn.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
-            await conn.execute(f"CREATE SCHEMA {schema}")
-
         for shard in [0, 1]:
             async with conn.transaction():
                 await conn.execute("SET LOCAL statement_timeout TO '10s'")
                 schema = f"shard_{shard}"
+                # The table already exists; this keeps DDL routed inside a transaction.
                 await conn.execute(
-                    f"CREATE TABLE {schema}.test(id BIGINT, created_at TIMESTAMPTZ DEFAULT NOW())"
+                    f"CREATE TABLE IF NOT EXISTS {schema}.test(id BIGINT, created_at TIMESTAMPTZ DEFAULT NOW())"
                 )
                 await conn.fetch(f"SELECT * FROM {schema}.test WHERE id = $1", 1)
 
@@ -577,6 +555,8 @@ async def test_schema_sharding_transactions():
                     f"DELETE FROM {schema}.test WHERE id = $1", 3
                 )
                 assert delete == "DELETE 1"
+
+                await conn.execute(f"TRUNCATE {schema}.test")
     admin().cursor().execute("SET cross_shard_disabled TO false")
 
 
@@ -613,22 +593,26 @@ async def test_schema_sharding_search_path():
             f"CREATE TABLE IF NOT EXISTS {schema}.test(id BIGINT, created_at TIMESTAMPTZ DEFAULT NOW())"
         )
 
-    import asyncio
-
     async def run_test():
         conn = await schema_sharded_async()
+        selects = {
+            schema: await conn.prepare(f"SELECT * FROM {schema}.test WHERE id = $1")
+            for schema in ["shard_0", "shard_1"]
+        }
 
         for _ in range(10):
-            for schema in ["shard_0", "shard_1"]:
+            for schema, select in selects.items():
                 await conn.execute(f"SET search_path TO {schema}")
 
                 async with conn.transaction():
                     await conn.execute("SET LOCAL statement_timeout TO '10s'")
-                    await conn.fetch(f"SELECT * FROM {schema}.test WHERE id = $1", 1)
+                    await select.fetch(1)
 
         await conn.close()
 
-    await asyncio.gather(*[run_test() for _ in range(10)])
+    async with asyncio.TaskGroup() as tg:
+        for _ in range(10):
+            tg.create_task(run_test())
     admin().cursor().execute("SET cross_shard_disabled TO false")
 
 
@@ -640,7 +624,7 @@ async def test_pgdog_role_selection():
         database="pgdog",
         host="127.0.0.1",
         port=6432,
-        statement_cache_size=250,
+        statement_cache_size=1024,
         server_settings={
             "pgdog.role": "replica",
         },
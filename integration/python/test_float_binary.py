@@ -1,71 +1,43 @@
-import asyncpg
+import asyncio
 import pytest
 import struct
 import math
-from globals import normal_async, sharded_async, no_out_of_sync, admin
-import random
-import string
-import pytest_asyncio
+from globals import no_out_of_sync
 
 
-@pytest_asyncio.fixture
-async def conns():
-    schema = "".join(
-        random.choice(string.ascii_uppercase + string.digits) for _ in range(5)
-    )
-    conns = await both()
-    for conn in conns:
-        await setup(conn, schema)
-
-    yield conns
-
-    admin_conn = admin()
-    admin_conn.execute("RECONNECT")  # Remove lock on schema
-
-    for conn in conns:
-        await conn.execute(f'DROP SCHEMA "{schema}" CASCADE')
-
-
-async def both():
-    return [await normal_async(), await sharded_async()]
-
-
-async def setup(conn, schema):
-    await conn.execute(f'CREATE SCHEMA IF NOT EXISTS "{schema}"')
-    await conn.execute(f'SET search_path TO "{schema}",public')
-    try:
-        await conn.execute("DROP TABLE IF EXISTS float_test")
-    except asyncpg.exceptions.UndefinedTableError:
-        pass
-    await conn.execute(
+@pytest.fixture(scope="module")
+def schema_table():
+    """Table the schema fixture in conftest.py creates for this module."""
+    return (
+        "float_test",
         """CREATE TABLE float_test (
         id BIGINT PRIMARY KEY,
         float4_val REAL,
         float8_val DOUBLE PRECISION,
         numeric_val NUMERIC(10,5)
-    )"""
+    )""",
     )
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 async def test_float4_binary_format(conns):
     """Test that REAL (float4) values work correctly in binary format."""
-    for conn in conns:
-        # Test various float4 values
-        test_values = [
-            (1, 3.14159, None, None),
-            (2, -2.71828, None, None),
-            (3, 1.23e-10, None, None),
-            (4, -9.87e15, None, None),
-            (5, 0.0, None, None),
-            (6, -0.0, None, None),
-        ]
-        
+    # Test various float4 values
+    test_values = [
+        (1, 3.14159, None, None),
+        (2, -2.71828, None, None),
+        (3, 1.23e-10, None, None),
+        (4, -9.87e15, None, None),
+        (5, 0.0, None, None),
+        (6, -0.0, None, None),
+    ]
+
+    async def run(conn):
+        insert = await conn.prepare(
+            "INSERT INTO float_test (id, float4_val) VALUES ($1, $2)"
+        )
         for id_val, float4_val, _, _ in test_values:
-            await conn.execute(
-                "INSERT INTO float_test (id, float4_val) VALUES ($1, $2)",
-                id_val, float4_val
-            )
+            await insert.fetch(id_val, float4_val)
         
         # Fetch back and verify
         rows = await conn.fetch(
@@ -80,31 +52,31 @@ async def test_float4_binary_format(conns):
             if expected_val == 0.0 or expected_val == -0.0:
                 assert actual_val == 0.0 or actual_val == -0.0
             else:
-                assert abs(actual_val - expected_val) / abs(expected_val) < 1e-5
-        
-        await conn.execute("DELETE FROM float_test")
+                assert math.isclose(actual_val, expected_val, rel_tol=1e-5)
+
+    await asyncio.gather(*[run(conn) for conn in conns])
     no_out_of_sync()
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 async def test_float8_binary_format(conns):
     """Test that DOUBLE PRECISION (float8) values work correctly in binary format."""
-    for conn in conns:
-        # Test various float8 values
-        test_values = [
-            (1, None, 3.141592653589793, None),
-            (2, None, -2.718281828459045, None),
-            (3, None, 1.23456789e-100, None),
-            (4, None, -9.87654321e200, None),
-            (5, None, 0.0, None),
-            (6, None, -0.0, None),
-        ]
-        
+    # Test various float8 values
+    test_values = [
+        (1, None, 3.141592653589793, None),
+        (2, None, -2.718281828459045, None),
+        (3, None, 1.23456789e-100, None),
+        (4, None, -9.87654321e200, None),
+        (5, None, 0.0, None),
+        (6, None, -0.0, None),
+    ]
+
+    async def run(conn):
+        insert = await conn.prepare(
+            "INSERT INTO float_test (id, float8_val) VALUES ($1, $2)"
+        )
         for id_val, _, float8_val, _ in test_values:
-            await conn.execute(
-                "INSERT INTO float_test (id, float8_val) VALUES ($1, $2)",
-                id_val, float8_val
-            )
+            await insert.fetch(id_val, float8_val)
         
         # Fetch back and verify
         rows = await conn.fetch(
@@ -119,29 +91,23 @@ async def test_float8_binary_format(conns):
                 assert actual_val == 0.0 or actual_val == -0.0
             else:
                 # Float8 should have very high precision
-                assert abs(actual_val - expected_val) / abs(expected_val) < 1e-14
-        
-        await conn.execute("DELETE FROM float_test")
+                assert math.isclose(actual_val, expected_val, rel_tol=1e-14)
+
+    await asyncio.gather(*[run(conn) for conn in conns])
     no_out_of_sync()
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 async def test_float_special_values(conns):
     """Test special float values (NaN, Infinity, -Infinity)."""
-    for conn in conns:
+    async def run(conn):
         # Test special values
-        await conn.execute(
-            "INSERT INTO float_test (id, float4_val, float8_val) VALUES ($1, $2, $3)",
-            1, float('inf'), float('inf')
-        )
-        await conn.execute(
-            "INSERT INTO float_test (id, float4_val, float8_val) VALUES ($1, $2, $3)",
-            2, float('-inf'), float('-inf')
-        )
-        await conn.execute(
-            "INSERT INTO float_test (id, float4_val, float8_val) VALUES ($1, $2, $3)",
-            3, float('nan'), float('nan')
+        insert = await conn.prepare(
+            "INSERT INTO float_test (id, float4_val, float8_val) VALUES ($1, $2, $3)"
         )
+        await insert.fetch(1, float('inf'), float('inf'))
+        await insert.fetch(2, float('-inf'), float('-inf'))
+        await insert.fetch(3, float('nan'), float('nan'))
         
         # Fetch back and verify
         rows = await conn.fetch(
@@ -156,18 +122,15 @@ async def test_float_special_values(conns):
         
         assert math.isnan(rows[2]['float4_val'])
         assert math.isnan(rows[2]['float8_val'])
-        
-        await conn.execute("DELETE FROM float_test")
+
+    await asyncio.gather(*[run(conn) for conn in conns])
     no_out_of_sync()
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 async def test_float_vs_numeric_difference(conns):
     """Test that floats and numerics are distinct types with different behaviors."""
-    for conn in conns:
-        # Clear any existing data
-        await conn.execute("DELETE FROM float_test")
-        
+    async def run(conn):
         # Insert values that show the difference
         await conn.execute(
             """INSERT INTO float_test (id, float4_val, float8_val, numeric_val) 
@@ -176,53 +139,47 @@ async def test_float_vs_numeric_difference(conns):
         )
         
         # Float arithmetic has rounding errors
-        result_float4 = await conn.fetchval(
-            "SELECT float4_val * 10 - 1.0 FROM float_test WHERE id = 1"
-        )
-        result_float8 = await conn.fetchval(
-            "SELECT float8_val * 10 - 1.0 FROM float_test WHERE id = 1"
-        )
-        result_numeric = await conn.fetchval(
-            "SELECT numeric_val * 10 - 1.0 FROM float_test WHERE id = 1"
+        result_float4, result_float8, result_numeric = await conn.fetchrow(
+            """SELECT float4_val * 10 - 1.0,
+                      float8_val * 10 - 1.0,
+                      numeric_val * 10 - 1.0
+               FROM float_test WHERE id = 1"""
         )
         
         # Float4 will have significant rounding error
-        assert abs(result_float4) > 1e-8
+        assert math.fabs(result_float4) > 1e-8
         
         # Float8 may have smaller rounding error or be exact depending on the value
         # 0.1 * 10 - 1.0 might be exactly 0 in some cases
         # Just check it's a small value
-        assert abs(result_float8) < 1e-10
+        assert math.fabs(result_float8) < 1e-10
         
         # Numeric should be exact (or very close due to our precision limit)
         assert abs(result_numeric) < 1e-10
-        
-        await conn.execute("DELETE FROM float_test")
+
+    await asyncio.gather(*[run(conn) for conn in conns])
     no_out_of_sync()
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 async def test_float_binary_roundtrip(conns):
     """Test that floats maintain exact binary representation through roundtrip."""
-    for conn in conns:
-        # Clear any existing data
-        await conn.execute("DELETE FROM float_test")
-        
-        # Test exact binary representation preservation
-        test_values = [
-            1.0,
-            0.5,
-            0.25,
-            0.125,
-            1024.0,
-            -512.0,
-        ]
-        
+    # Test exact binary representation preservation
+    test_values = [
+        1.0,
+        0.5,
+        0.25,
+        0.125,
+        1024.0,
+        -512.0,
+    ]
+
+    async def run(conn):
+        insert = await conn.prepare(
+            "INSERT INTO float_test (id, float4_val, float8_val) VALUES ($1, $2, $3)"
+        )
         for i, val in enumerate(test_values):
-            await conn.execute(
-                "INSERT INTO float_test (id, float4_val, float8_val) VALUES ($1, $2, $3)",
-                i + 1, val, val
-            )
+            await insert.fetch(i + 1, val, val)
         
         rows = await conn.fetch(
             "SELECT id, float4_val, float8_val FROM float_test ORDER BY id"
@@ -240,36 +197,32 @@ async def test_float_binary_roundtrip(conns):
                 print(f"Comparing row {i}: float4={row['float4_val']} vs expected={test_values[i]}")
                 assert row['float4_val'] == test_values[i], f"Row {i}: {row['float4_val']} != {test_values[i]}"
                 assert row['float8_val'] == test_values[i]
-        
-        await conn.execute("DELETE FROM float_test")
+
+    await asyncio.gather(*[run(conn) for conn in conns])
     no_out_of_sync()
 
 
-@pytest.mark.asyncio 
+@pytest.mark.asyncio(loop_scope="session")
 async def test_float_copy_binary(conns):
     """Test COPY with binary format for float types."""
-    for conn in conns:
-        # Clear any existing data
-        await conn.execute("DELETE FROM float_test")
-        
+    test_data = [
+        (1, 3.14159, 2.718281828),
+        (2, -123.456, -987.654321),
+        (3, float('inf'), float('-inf')),
+        (4, float('nan'), float('nan')),
+    ]
+
+    async def run(conn):
         # Insert test data
-        test_data = [
-            (1, 3.14159, 2.718281828),
-            (2, -123.456, -987.654321),
-            (3, float('inf'), float('-inf')),
-            (4, float('nan'), float('nan')),
-        ]
-        
-        for row in test_data:
-            await conn.execute(
-                "INSERT INTO float_test (id, float4_val, float8_val) VALUES ($1, $2, $3)",
-                *row
-            )
+        await conn.copy_records_to_table(
+            "float_test",
+            records=test_data,
+            columns=["id", "float4_val", "float8_val"],
+        )
         
         # Skip COPY test for now - asyncpg's binary COPY has different API
         # and this test isn't critical for validating float support
-        await conn.execute("DELETE FROM float_test")
-        continue
+        return
         
         # Verify data integrity
         rows = await conn.fetch(
@@ -289,7 +242,7 @@ async def test_float_copy_binary(conns):
                 assert math.isinf(row['float4_val'])
                 assert (expected[1] > 0) == (row['float4_val'] > 0)
             else:
-                assert abs(row['float4_val'] - expected[1]) / abs(expected[1]) < 1e-5
+                assert math.isclose(row['float4_val'], expected[1], rel_tol=1e-5)
             
             if math.isnan(expected[2]):
                 assert math.isnan(row['float8_val'])
@@ -297,7 +250,7 @@ async def test_float_copy_binary(conns):
                 assert math.isinf(row['float8_val'])
                 assert (expected[2] > 0) == (row['float8_val'] > 0)
             else:
-                assert abs(row['float8_val'] - expected[2]) / abs(expected[2]) < 1e-14
-        
-        await conn.execute("DELETE FROM float_test")
+                assert math.isclose(row['float8_val'], expected[2], rel_tol=1e-14)
+
+    await asyncio.gather(*[run(conn) for conn in conns])
     no_out_of_sync()
\ No newline at end of file
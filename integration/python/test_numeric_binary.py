@@ -1,63 +1,113 @@
 import asyncpg
+import math
 import pytest
 from decimal import Decimal
-from globals import normal_async, sharded_async, no_out_of_sync
+from globals import no_out_of_sync
 import pytest_asyncio
 
+# agg_test rows: multiples of 10.5, with the NUMERIC column built exactly.
+AGG_ROWS = [(i, i * Decimal("10.5"), i * 10.5, i * 10.5) for i in range(1, 11)]
 
-@pytest.mark.asyncio
-async def test_numeric_binary_format():
+# numeric_test rows: (id, NUMERIC, REAL, DOUBLE PRECISION).
+NUMERIC_ROWS = (
+    # Basic values
+    (1, Decimal("123.456"), 123.456, 123.456),
+    (2, Decimal("0"), 0.0, 0.0),
+    (3, Decimal("-999.99"), -999.99, -999.99),
+
+    # Edge cases for decimal
+    (4, Decimal("0.0001"), 0.0001, 0.0001),
+    (5, Decimal("10000"), 10000.0, 10000.0),
+    (6, Decimal("0.3"), 0.3, 0.3),  # Classic floating point issue
+
+    # Large values
+    (7, Decimal("999999999999999999"), 1e18, 1e18),
+
+    # Precision tests
+    (8, Decimal("0.1") + Decimal("0.2"), 0.1 + 0.2, 0.1 + 0.2),  # Should be exactly 0.3 for Decimal
+
+    # Special float values
+    (9, Decimal("123"), math.inf, math.inf),
+    (10, Decimal("456"), -math.inf, -math.inf),
+    (11, Decimal("789"), math.nan, math.nan),
+)
+
+# sort_test rows, deliberately out of order.
+SORT_ROWS = (
+    (3, Decimal("100.5"), 100.5, 100.5),
+    (1, Decimal("-50"), -50.0, -50.0),
+    (103, Decimal("0"), 0.0, 0.0),
+    (2, Decimal("999.99"), 999.99, 999.99),
+    (102, Decimal("-999.99"), -999.99, -999.99),
+    (101, Decimal("50"), 50.0, 50.0),
+    # Special values that should sort last
+    (104, Decimal("0"), math.nan, math.nan),
+)
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="session")
+async def tables(pools):
+    """Create numeric_test and agg_test (normal) and sort_test (sharded).
+
+    The three tables share a NUMERIC/REAL/DOUBLE PRECISION layout. They're
+    created once for the module, and each test truncates the one it used.
+    """
+    normal, sharded = pools
+
+    await normal.execute("DROP TABLE IF EXISTS numeric_test CASCADE")
+    await normal.execute("""
+        CREATE TABLE numeric_test (
+            id INTEGER PRIMARY KEY,
+            num_val NUMERIC,
+            float_val REAL,
+            double_val DOUBLE PRECISION
+        )
+    """)
+
+    await sharded.execute("DROP TABLE IF EXISTS sort_test CASCADE")
+    await sharded.execute("""
+        CREATE TABLE sort_test (
+            id BIGINT PRIMARY KEY,
+            num_val NUMERIC,
+            float_val REAL,
+            double_val DOUBLE PRECISION
+        )
+    """)
+
+    await normal.execute("DROP TABLE IF EXISTS agg_test CASCADE")
+    await normal.execute("""
+        CREATE TABLE agg_test (
+            id INTEGER PRIMARY KEY,
+            num_val NUMERIC,
+            float_val REAL,
+            double_val DOUBLE PRECISION
+        )
+    """)
+
+    yield
+
+    await normal.execute("DROP TABLE numeric_test, agg_test CASCADE")
+    await sharded.execute("DROP TABLE sort_test CASCADE")
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_numeric_binary_format(pools, tables):
     """Test numeric types with binary format through asyncpg."""
-    conn = await normal_async()
+    pool = pools[0]
+    conn = await pool.acquire()
     
     try:
-        await conn.execute("DROP TABLE IF EXISTS numeric_test CASCADE")
-        
-        await conn.execute("""
-            CREATE TABLE numeric_test (
-                id INTEGER PRIMARY KEY,
-                num_val NUMERIC,
-                float_val REAL,
-                double_val DOUBLE PRECISION
-            )
-        """)
-        
-        # Test cases covering various numeric scenarios
-        test_data = [
-            # Basic values
-            (1, Decimal("123.456"), 123.456, 123.456),
-            (2, Decimal("0"), 0.0, 0.0),
-            (3, Decimal("-999.99"), -999.99, -999.99),
-            
-            # Edge cases for decimal
-            (4, Decimal("0.0001"), 0.0001, 0.0001),
-            (5, Decimal("10000"), 10000.0, 10000.0),
-            (6, Decimal("0.3"), 0.3, 0.3),  # Classic floating point issue
-            
-            # Large values
-            (7, Decimal("999999999999999999"), 1e18, 1e18),
-            
-            # Precision tests
-            (8, Decimal("0.1") + Decimal("0.2"), 0.1 + 0.2, 0.1 + 0.2),  # Should be exactly 0.3 for Decimal
-            
-            # Special float values
-            (9, Decimal("123"), float('inf'), float('inf')),
-            (10, Decimal("456"), float('-inf'), float('-inf')),
-            (11, Decimal("789"), float('nan'), float('nan')),
-        ]
-        
         # Insert data
-        for row in test_data:
-            await conn.execute(
-                "INSERT INTO numeric_test (id, num_val, float_val, double_val) VALUES ($1, $2, $3, $4)",
-                *row
-            )
+        await conn.executemany(
+            "INSERT INTO numeric_test (id, num_val, float_val, double_val) VALUES ($1, $2, $3, $4)",
+            NUMERIC_ROWS
+        )
         
         # Fetch and verify - asyncpg uses binary protocol by default
         rows = await conn.fetch("SELECT * FROM numeric_test ORDER BY id")
         
         for i, row in enumerate(rows):
-            expected = test_data[i]
+            expected = NUMERIC_ROWS[i]
             
             # Check ID
             assert row['id'] == expected[0], f"ID mismatch for row {i}"
@@ -72,12 +122,10 @@ async def test_numeric_binary_format():
             # Check REAL (float)
             fetched_float = row['float_val']
             expected_float = expected[2]
-            if expected_float != expected_float:  # NaN check
-                assert fetched_float != fetched_float, f"Expected NaN for row {i}"
-            elif expected_float == float('inf'):
-                assert fetched_float == float('inf'), f"Expected infinity for row {i}"
-            elif expected_float == float('-inf'):
-                assert fetched_float == float('-inf'), f"Expected -infinity for row {i}"
+            if math.isnan(expected_float):
+                assert math.isnan(fetched_float), f"Expected NaN for row {i}"
+            elif math.isinf(expected_float):
+                assert fetched_float == expected_float, f"Expected {expected_float} for row {i}"
             else:
                 # Float4 has limited precision (~7 significant digits)
                 # Use relative tolerance for comparison
@@ -92,58 +140,36 @@ async def test_numeric_binary_format():
             # Check DOUBLE PRECISION
             fetched_double = row['double_val']
             expected_double = expected[3]
-            if expected_double != expected_double:  # NaN check
-                assert fetched_double != fetched_double, f"Expected NaN for row {i}"
-            elif expected_double == float('inf'):
-                assert fetched_double == float('inf'), f"Expected infinity for row {i}"
-            elif expected_double == float('-inf'):
-                assert fetched_double == float('-inf'), f"Expected -infinity for row {i}"
+            if math.isnan(expected_double):
+                assert math.isnan(fetched_double), f"Expected NaN for row {i}"
+            elif math.isinf(expected_double):
+                assert fetched_double == expected_double, f"Expected {expected_double} for row {i}"
             else:
                 assert abs(fetched_double - expected_double) < 1e-10, \
                     f"Double mismatch for row {i}: got {fetched_double}, expected {expected_double}"
         
-        await conn.execute("DROP TABLE numeric_test CASCADE")
-        
     finally:
-        await conn.close()
+        try:
+            await conn.execute("TRUNCATE numeric_test")
+        finally:
+            await pool.release(conn)
     
     no_out_of_sync()
 
 
-@pytest.mark.asyncio
-async def test_numeric_sorting_binary():
+@pytest.mark.asyncio(loop_scope="session")
+async def test_numeric_sorting_binary(pools, tables):
     """Test that numeric types sort correctly with binary format."""
-    conn = await sharded_async()
+    pool = pools[1]
+    conn = await pool.acquire()
     
     try:
-        await conn.execute("DROP TABLE IF EXISTS sort_test CASCADE")
-        
-        await conn.execute("""
-            CREATE TABLE sort_test (
-                id BIGINT PRIMARY KEY,
-                num_val NUMERIC,
-                float_val REAL,
-                double_val DOUBLE PRECISION
-            )
-        """)
-        
-        # Insert values in random order
-        test_data = [
-            (3, Decimal("100.5"), 100.5, 100.5),
-            (1, Decimal("-50"), -50.0, -50.0),
-            (103, Decimal("0"), 0.0, 0.0),
-            (2, Decimal("999.99"), 999.99, 999.99),
-            (102, Decimal("-999.99"), -999.99, -999.99),
-            (101, Decimal("50"), 50.0, 50.0),
-            # Special values that should sort last
-            (104, Decimal("0"), float('nan'), float('nan')),
-        ]
-        
-        for row in test_data:
-            await conn.execute(
-                "INSERT INTO sort_test (id, num_val, float_val, double_val) VALUES ($1, $2, $3, $4)",
-                *row
-            )
+        # sort_test is sharded on id, so each binary Bind is routed by its id.
+        insert = await conn.prepare(
+            "INSERT INTO sort_test (id, num_val, float_val, double_val) VALUES ($1, $2, $3, $4)"
+        )
+        for row in SORT_ROWS:
+            await insert.fetch(*row)
         
         # Test NUMERIC sorting
         rows = await conn.fetch("SELECT id, num_val FROM sort_test WHERE num_val IS NOT NULL ORDER BY num_val")
@@ -163,58 +189,54 @@ async def test_numeric_sorting_binary():
         double_ids = [row['id'] for row in rows]
         assert double_ids[-1] == 104, "NaN should sort last for DOUBLE PRECISION"
         
-        await conn.execute("DROP TABLE sort_test CASCADE")
-        
     finally:
-        await conn.close()
+        try:
+            await conn.execute("TRUNCATE sort_test")
+        finally:
+            await pool.release(conn)
     
     no_out_of_sync()
 
 
-@pytest.mark.asyncio
-async def test_numeric_aggregates_binary():
+@pytest.mark.asyncio(loop_scope="session")
+async def test_numeric_aggregates_binary(pools, tables):
     """Test numeric aggregates with binary format."""
-    conn = await normal_async()
+    pool = pools[0]
+    conn = await pool.acquire()
     
     try:
-        await conn.execute("DROP TABLE IF EXISTS agg_test CASCADE")
-        
-        await conn.execute("""
-            CREATE TABLE agg_test (
-                id INTEGER PRIMARY KEY,
-                num_val NUMERIC,
-                float_val REAL,
-                double_val DOUBLE PRECISION
-            )
-        """)
-        
         # Insert test data
-        for i in range(1, 11):
-            await conn.execute(
-                "INSERT INTO agg_test VALUES ($1, $2, $3, $4)",
-                i, Decimal(str(i * 10.5)), i * 10.5, i * 10.5
-            )
-        
+        await conn.executemany(
+            "INSERT INTO agg_test VALUES ($1, $2, $3, $4)",
+            AGG_ROWS
+        )
+        
+        row = await conn.fetchrow("""
+            SELECT
+                SUM(num_val) as sum_n, SUM(float_val) as sum_f, SUM(double_val) as sum_d,
+                AVG(num_val) as avg_n, AVG(float_val) as avg_f, AVG(double_val) as avg_d,
+                MIN(num_val) as min_n, MAX(num_val) as max_n
+            FROM agg_test
+        """)
+
         # Test SUM
-        row = await conn.fetchrow("SELECT SUM(num_val) as n, SUM(float_val) as f, SUM(double_val) as d FROM agg_test")
-        assert row['n'] == Decimal("577.5")  # 10.5 + 21 + 31.5 + ... + 105
-        assert abs(row['f'] - 577.5) < 0.1
-        assert abs(row['d'] - 577.5) < 0.001
+        assert row['sum_n'] == Decimal("577.5")  # 10.5 + 21 + 31.5 + ... + 105
+        assert abs(row['sum_f'] - 577.5) < 0.1
+        assert abs(row['sum_d'] - 577.5) < 0.001
         
         # Test AVG
-        row = await conn.fetchrow("SELECT AVG(num_val) as n, AVG(float_val) as f, AVG(double_val) as d FROM agg_test")
-        assert row['n'] == Decimal("57.75")
-        assert abs(row['f'] - 57.75) < 0.01
-        assert abs(row['d'] - 57.75) < 0.001
+        assert row['avg_n'] == Decimal("57.75")
+        assert abs(row['avg_f'] - 57.75) < 0.01
+        assert abs(row['avg_d'] - 57.75) < 0.001
         
         # Test MIN/MAX
-        row = await conn.fetchrow("SELECT MIN(num_val) as min_n, MAX(num_val) as max_n FROM agg_test")
         assert row['min_n'] == Decimal("10.5")
         assert row['max_n'] == Decimal("105")
         
-        await conn.execute("DROP TABLE agg_test CASCADE")
-        
     finally:
-        await conn.close()
+        try:
+            await conn.execute("TRUNCATE agg_test")
+        finally:
+            await pool.release(conn)
     
     no_out_of_sync()
\ No newline at end of file
@@ -4,29 +4,49 @@ Test suite for numeric type support in pgdog's multi-shard environment.
 
 import asyncpg
 import pytest
+import pytest_asyncio
 from decimal import Decimal
-from globals import normal_async, sharded_async
 
 
-async def setup_sharded_numeric_table(conn):
-    """Helper function to create the sharded_numeric table."""
-    await conn.execute("DROP TABLE IF EXISTS sharded_numeric")
-    await conn.execute("""
+@pytest_asyncio.fixture(scope="module", loop_scope="session")
+async def tables(pools):
+    """Create sharded_numeric (sharded) and numeric_math (normal).
+
+    Both are created once for the module. Each test truncates the one
+    it used.
+    """
+    normal, sharded = pools
+
+    await sharded.execute("DROP TABLE IF EXISTS sharded_numeric")
+    await sharded.execute("""
         CREATE TABLE sharded_numeric (
             id BIGINT PRIMARY KEY,
             value NUMERIC
         )
     """)
 
+    await normal.execute("DROP TABLE IF EXISTS numeric_math")
+    await normal.execute("""
+        CREATE TABLE numeric_math (
+            id BIGINT PRIMARY KEY,
+            a NUMERIC,
+            b NUMERIC
+        )
+    """)
+
+    yield
+
+    await sharded.execute("DROP TABLE sharded_numeric")
+    await normal.execute("DROP TABLE numeric_math")
 
-@pytest.mark.asyncio
-async def test_numeric_cross_shard_sorting():
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_numeric_cross_shard_sorting(pools, tables):
     """Test that numeric values are correctly sorted across shards."""
-    conn = await sharded_async()
+    pool = pools[1]
+    conn = await pool.acquire()
     
     try:
-        await setup_sharded_numeric_table(conn)
-        
         # Test various numeric values across shards
         test_data = [
             # Shard 0 - mix of values
@@ -39,11 +59,11 @@ async def test_numeric_cross_shard_sorting():
             (103, Decimal("999.99")),
         ]
         
+        insert = await conn.prepare(
+            "INSERT INTO sharded_numeric (id, value) VALUES ($1, $2)"
+        )
         for id_val, value in test_data:
-            await conn.execute(
-                "INSERT INTO sharded_numeric (id, value) VALUES ($1, $2)",
-                id_val, value
-            )
+            await insert.fetch(id_val, value)
         
         # Test ascending order
         rows_asc = await conn.fetch(
@@ -71,18 +91,19 @@ async def test_numeric_cross_shard_sorting():
         assert actual_desc == list(reversed(expected_asc))
         
     finally:
-        await conn.execute("TRUNCATE TABLE sharded_numeric")
-        await conn.close()
+        try:
+            await conn.execute("TRUNCATE TABLE sharded_numeric")
+        finally:
+            await pool.release(conn)
 
 
-@pytest.mark.asyncio
-async def test_numeric_precision_and_edge_cases():
+@pytest.mark.asyncio(loop_scope="session")
+async def test_numeric_precision_and_edge_cases(pools, tables):
     """Test high precision decimals and edge cases."""
-    conn = await sharded_async()
+    pool = pools[1]
+    conn = await pool.acquire()
     
     try:
-        await setup_sharded_numeric_table(conn)
-        
         # Test precision preservation and edge cases
         test_data = [
             # High precision values
@@ -96,11 +117,11 @@ async def test_numeric_precision_and_edge_cases():
             (102, Decimal("999999999999.999999")),
         ]
         
+        insert = await conn.prepare(
+            "INSERT INTO sharded_numeric (id, value) VALUES ($1, $2)"
+        )
         for id_val, value in test_data:
-            await conn.execute(
-                "INSERT INTO sharded_numeric (id, value) VALUES ($1, $2)",
-                id_val, value
-            )
+            await insert.fetch(id_val, value)
         
         # Verify precision is preserved
         row = await conn.fetchrow(
@@ -127,48 +148,43 @@ async def test_numeric_precision_and_edge_cases():
         ]
         
     finally:
-        await conn.execute("TRUNCATE TABLE sharded_numeric")
-        await conn.close()
+        try:
+            await conn.execute("TRUNCATE TABLE sharded_numeric")
+        finally:
+            await pool.release(conn)
 
 
-@pytest.mark.asyncio
-async def test_numeric_arithmetic_operations():
+@pytest.mark.asyncio(loop_scope="session")
+async def test_numeric_arithmetic_operations(pools, tables):
     """Test arithmetic operations preserve precision."""
-    conn = await normal_async()
+    pool = pools[0]
+    conn = await pool.acquire()
     
     try:
-        await conn.execute("DROP TABLE IF EXISTS numeric_math")
-        await conn.execute("""
-            CREATE TABLE numeric_math (
-                id BIGINT PRIMARY KEY,
-                a NUMERIC,
-                b NUMERIC
+        async with conn.transaction():
+            insert = await conn.prepare(
+                "INSERT INTO numeric_math (id, a, b) VALUES ($1, $2, $3)"
             )
-        """)
-        
-        # Insert values that demonstrate precision
-        await conn.execute(
-            "INSERT INTO numeric_math (id, a, b) VALUES ($1, $2, $3)",
-            1, Decimal("0.1"), Decimal("0.2")
-        )
-        
-        # Test that 0.1 + 0.2 = 0.3 exactly (not 0.30000000000000004)
-        result = await conn.fetchval(
-            "SELECT a + b FROM numeric_math WHERE id = 1"
-        )
-        assert result == Decimal("0.3")
-        
-        # Test multiplication precision
-        await conn.execute(
-            "INSERT INTO numeric_math (id, a, b) VALUES ($1, $2, $3)",
-            2, Decimal("19.99"), Decimal("3.5")
-        )
-        
-        result = await conn.fetchval(
-            "SELECT a * b FROM numeric_math WHERE id = 2"
-        )
-        assert result == Decimal("69.965")
+
+            # Insert values that demonstrate precision
+            await insert.fetch(1, Decimal("0.1"), Decimal("0.2"))
+
+            # Test that 0.1 + 0.2 = 0.3 exactly (not 0.30000000000000004)
+            result = await conn.fetchval(
+                "SELECT a + b FROM numeric_math WHERE id = 1"
+            )
+            assert result == Decimal("0.3")
+
+            # Test multiplication precision
+            await insert.fetch(2, Decimal("19.99"), Decimal("3.5"))
+
+            result = await conn.fetchval(
+                "SELECT a * b FROM numeric_math WHERE id = 2"
+            )
+            assert result == Decimal("69.965")
         
     finally:
-        await conn.execute("DROP TABLE IF EXISTS numeric_math")
-        await conn.close()
\ No newline at end of file
+        try:
+            await conn.execute("TRUNCATE TABLE numeric_math")
+        finally:
+            await pool.release(conn)
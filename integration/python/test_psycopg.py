@@ -1,8 +1,51 @@
+import functools
 import psycopg
 import pytest
 from globals import direct_sync, no_out_of_sync, normal_sync, sharded_sync
 
 
+@pytest.fixture(scope="module")
+def connections():
+    """One normal and one sharded connection shared by this module's tests."""
+    normal, sharded = normal_sync(), sharded_sync()
+    normal.execute("DROP TABLE IF EXISTS pipeline_test")
+    normal.execute("CREATE TABLE pipeline_test (id BIGINT PRIMARY KEY, value TEXT)")
+    normal.commit()
+
+    yield normal, sharded
+
+    normal.rollback()
+    normal.autocommit = True
+    normal.execute("DROP TABLE pipeline_test")
+    normal.close()
+    sharded.close()
+
+
+def _reset(conn):
+    """Hand a shared connection to the next test idle and out of autocommit."""
+    conn.rollback()
+    conn.autocommit = False
+    return conn
+
+
+@pytest.fixture
+def conn(connections):
+    return _reset(connections[0])
+
+
+@pytest.fixture
+def sharded_conn(connections):
+    return _reset(connections[1])
+
+
+@pytest.fixture
+def pipeline_conn(connections):
+    """A fresh normal connection, so one broken pipeline can't fail later tests."""
+    conn = normal_sync()
+    yield conn
+    conn.close()
+
+
 def setup(conn):
     try:
         conn.cursor().execute("DROP TABLE sharded")
@@ -20,12 +63,12 @@ def setup(conn):
     conn.commit()
 
 
-def test_connect():
-    for conn in [normal_sync(), sharded_sync()]:
-        cur = conn.cursor()
+def test_connect(conn, sharded_conn):
+    for c in [conn, sharded_conn]:
+        cur = c.cursor()
         cur.execute("SELECT 1::bigint")
         one = cur.fetchall()
-        conn.commit()
+        c.commit()
         assert len(one) == 1
         assert one[0][0] == 1
     no_out_of_sync()
@@ -53,16 +96,18 @@ def test_admin_pgcli_detection():
     assert executor.is_virtual_database()
 
 
-def test_insert_sharded():
-    _run_insert_test(sharded_sync())
+def test_insert_sharded(sharded_conn):
+    _run_insert_test(sharded_conn)
 
 
-def test_insert_normal():
-    _run_insert_test(normal_sync())
+def test_insert_normal(conn):
+    _run_insert_test(conn)
 
 
 def _run_insert_test(conn):
     setup(conn)
+    conn.autocommit = True
+    cur = conn.cursor()
 
     for start in [
         1,
@@ -72,32 +117,42 @@ def _run_insert_test(conn):
         10_000_000_000,
         10_000_000_000_000,
     ]:
-        for offset in range(250):
-            id = start + offset
-            cur = conn.cursor()
+        ids = list(range(start, start + 250))
+        for id in ids:
             cur.execute(
                 "INSERT INTO sharded (id, value) VALUES (%s, %s) RETURNING *",
                 (id, "test"),
             )
             results = cur.fetchall()
-            conn.commit()
 
             assert len(results) == 1
             assert results[0][0] == id
 
+        cur.execute(
+            "SELECT id FROM sharded WHERE id >= %s AND id < %s ORDER BY id",
+            (ids[0], ids[-1] + 1),
+        )
+        assert [row[0] for row in cur.fetchall()] == ids
+
+        # The range scan goes to every shard; read a sample back by id
+        # so single-shard routing is still covered.
+        for id in ids[::25]:
             cur.execute("SELECT * FROM sharded WHERE id = %s", (id,))
             results = cur.fetchall()
-            conn.commit()
 
             assert len(results) == 1
             assert results[0][0] == id
     no_out_of_sync()
 
 
+@functools.cache
+def _parameter_query(count: int) -> tuple[str, tuple[int, ...]]:
+    placeholders = ", ".join(["%s"] * count)
+    return f"SELECT array_length(ARRAY[{placeholders}], 1)", tuple(range(count))
+
+
 def _execute_parameter_count(conn, count: int) -> int:
-    placeholders = ", ".join("%s" for _ in range(count))
-    query = f"SELECT array_length(ARRAY[{placeholders}], 1)"
-    params = list(range(count))
+    query, params = _parameter_query(count)
     cur = conn.cursor()
     cur.execute(query, params)
     value = cur.fetchone()[0]
@@ -141,212 +196,192 @@ def test_postgres_variants_parameter_limits(count, expect_error_keywords):
         assert successes == [count, count]
 
 
-def test_pipeline():
-    conn = normal_sync()
-    conn.autocommit = True
+def test_pipeline(pipeline_conn):
+    pipeline_conn.autocommit = True
 
-    with conn.pipeline():
-        cur = conn.cursor()
+    with pipeline_conn.pipeline():
+        cur = pipeline_conn.cursor()
         cur.execute("SELECT 1::bigint")
-        cur2 = conn.cursor()
+        cur2 = pipeline_conn.cursor()
         cur2.execute("SELECT 2::bigint")
-        cur3 = conn.cursor()
+        cur3 = pipeline_conn.cursor()
         cur3.execute("SELECT 3::bigint")
 
         assert cur.fetchone()[0] == 1
         assert cur2.fetchone()[0] == 2
         assert cur3.fetchone()[0] == 3
 
-    conn.close()
     no_out_of_sync()
 
 
-def test_pipeline_many_queries():
+def test_pipeline_many_queries(pipeline_conn):
     """Stress the splicing logic with many queries in a single pipeline.
 
     pgdog splits multi-Execute pipelines into separate sub-requests.
     If any response is dropped during splicing, libpq can't exit pipeline mode.
     """
-    conn = normal_sync()
-    conn.autocommit = True
+    pipeline_conn.autocommit = True
 
-    with conn.pipeline():
+    with pipeline_conn.pipeline():
         cursors = []
         for i in range(50):
-            cur = conn.cursor()
+            cur = pipeline_conn.cursor()
             cur.execute("SELECT %s::bigint", (i,))
             cursors.append((cur, i))
 
         for cur, expected in cursors:
             assert cur.fetchone()[0] == expected
 
-    conn.close()
     no_out_of_sync()
 
 
-def test_pipeline_executemany():
+def test_pipeline_executemany(pipeline_conn):
     """executemany in pipeline mode sends Parse once, then multiple Bind/Execute.
 
     This is a different splicing pattern than multiple separate execute() calls.
     """
-    conn = normal_sync()
-
-    conn.execute("DROP TABLE IF EXISTS pipeline_test")
-    conn.execute("CREATE TABLE pipeline_test (id BIGINT PRIMARY KEY, value TEXT)")
-    conn.commit()
+    pipeline_conn.execute("TRUNCATE pipeline_test")
+    pipeline_conn.commit()
 
-    with conn.pipeline():
-        cur = conn.cursor()
+    with pipeline_conn.pipeline():
+        cur = pipeline_conn.cursor()
         cur.executemany(
             "INSERT INTO pipeline_test (id, value) VALUES (%s, %s)",
             [(i, f"val_{i}") for i in range(100)],
         )
-        conn.commit()
+        pipeline_conn.commit()
 
-    cur = conn.cursor()
+    cur = pipeline_conn.cursor()
     cur.execute("SELECT count(*) FROM pipeline_test")
     assert cur.fetchone()[0] == 100
-    conn.commit()
+    pipeline_conn.commit()
 
-    conn.execute("DROP TABLE pipeline_test")
-    conn.commit()
-    conn.close()
     no_out_of_sync()
 
 
-def test_pipeline_transaction():
-    conn = normal_sync()
-
-    conn.execute("DROP TABLE IF EXISTS pipeline_test")
-    conn.execute("CREATE TABLE pipeline_test (id BIGINT PRIMARY KEY, value TEXT)")
-    conn.commit()
+def test_pipeline_transaction(pipeline_conn):
+    pipeline_conn.execute("TRUNCATE pipeline_test")
+    pipeline_conn.commit()
 
-    with conn.pipeline():
-        conn.execute("INSERT INTO pipeline_test (id, value) VALUES (%s, %s)", (1, "a"))
-        conn.execute("INSERT INTO pipeline_test (id, value) VALUES (%s, %s)", (2, "b"))
-        conn.execute("INSERT INTO pipeline_test (id, value) VALUES (%s, %s)", (3, "c"))
-        conn.commit()
+    with pipeline_conn.pipeline():
+        pipeline_conn.execute(
+            "INSERT INTO pipeline_test (id, value) VALUES (%s, %s)", (1, "a")
+        )
+        pipeline_conn.execute(
+            "INSERT INTO pipeline_test (id, value) VALUES (%s, %s)", (2, "b")
+        )
+        pipeline_conn.execute(
+            "INSERT INTO pipeline_test (id, value) VALUES (%s, %s)", (3, "c")
+        )
+        pipeline_conn.commit()
 
-        cur = conn.cursor()
+        cur = pipeline_conn.cursor()
         cur.execute("SELECT count(*) FROM pipeline_test")
         assert cur.fetchone()[0] == 3
-        conn.commit()
+        pipeline_conn.commit()
 
-    conn.execute("DROP TABLE pipeline_test")
-    conn.commit()
-    conn.close()
     no_out_of_sync()
 
 
-def test_pipeline_fetch_after_exit():
+def test_pipeline_fetch_after_exit(pipeline_conn):
     """Results fetched after exiting pipeline context.
 
     psycopg must drain all pending results when exiting the pipeline block.
     If pgdog didn't send all responses, this triggers 'cannot exit pipeline
     mode while busy'.
     """
-    conn = normal_sync()
-    conn.autocommit = True
+    pipeline_conn.autocommit = True
 
-    with conn.pipeline():
-        cur1 = conn.cursor()
+    with pipeline_conn.pipeline():
+        cur1 = pipeline_conn.cursor()
         cur1.execute("SELECT 1::bigint")
-        cur2 = conn.cursor()
+        cur2 = pipeline_conn.cursor()
         cur2.execute("SELECT 2::bigint")
 
     assert cur1.fetchone()[0] == 1
     assert cur2.fetchone()[0] == 2
 
-    conn.close()
     no_out_of_sync()
 
 
-def test_pipeline_repeated():
+def test_pipeline_repeated(pipeline_conn):
     """Multiple pipeline blocks on the same connection.
 
     Tests that pgdog properly resets state between pipelines.
     """
-    conn = normal_sync()
-    conn.autocommit = True
+    pipeline_conn.autocommit = True
 
     for batch in range(10):
-        with conn.pipeline():
+        with pipeline_conn.pipeline():
             cursors = []
             for i in range(10):
-                cur = conn.cursor()
+                cur = pipeline_conn.cursor()
                 cur.execute("SELECT %s::bigint", (batch * 10 + i,))
                 cursors.append((cur, batch * 10 + i))
 
             for cur, expected in cursors:
                 assert cur.fetchone()[0] == expected
 
-    conn.close()
     no_out_of_sync()
 
 
-def test_pipeline_query_then_nonpipeline():
+def test_pipeline_query_then_nonpipeline(pipeline_conn):
     """Pipeline followed immediately by non-pipeline query.
 
     If pipeline exit fails, the subsequent simple query triggers
     'PQsendQuery not allowed in pipeline mode'.
     """
-    conn = normal_sync()
-    conn.autocommit = True
+    pipeline_conn.autocommit = True
 
-    with conn.pipeline():
-        cur = conn.cursor()
+    with pipeline_conn.pipeline():
+        cur = pipeline_conn.cursor()
         cur.execute("SELECT 1::bigint")
         cur.fetchone()
 
-    cur = conn.cursor()
+    cur = pipeline_conn.cursor()
     cur.execute("SELECT 2::bigint")
     assert cur.fetchone()[0] == 2
 
-    conn.close()
     no_out_of_sync()
 
 
-def test_pipeline_error_recovery():
-    conn = normal_sync()
-    conn.autocommit = True
+def test_pipeline_error_recovery(pipeline_conn):
+    pipeline_conn.autocommit = True
 
-    with conn.pipeline():
-        cur = conn.cursor()
+    with pipeline_conn.pipeline():
+        cur = pipeline_conn.cursor()
         cur.execute("SELECT 1::bigint")
         assert cur.fetchone()[0] == 1
 
     with pytest.raises(psycopg.errors.UndefinedTable):
-        with conn.pipeline():
-            cur = conn.cursor()
+        with pipeline_conn.pipeline():
+            cur = pipeline_conn.cursor()
             cur.execute("SELECT * FROM nonexistent_table_pipeline_test")
             cur.fetchall()
 
-    with conn.pipeline():
-        cur = conn.cursor()
+    with pipeline_conn.pipeline():
+        cur = pipeline_conn.cursor()
         cur.execute("SELECT 42::bigint")
         assert cur.fetchone()[0] == 42
 
-    conn.close()
     no_out_of_sync()
 
 
-def test_pipeline_multiple_errors():
+def test_pipeline_multiple_errors(pipeline_conn):
     """Pipeline with multiple queries to a non-existent table.
 
     Tests that pipeline mode properly handles errors when multiple
     queries are sent without waiting for server responses.
     """
-    conn = normal_sync()
-    conn.autocommit = True
+    pipeline_conn.autocommit = True
 
     # Pipeline with multiple errors should return the first error
     # and not timeout or get stuck in "cannot exit pipeline mode"
     with pytest.raises(psycopg.errors.UndefinedTable):
-        with conn.pipeline():
-            cur = conn.cursor()
+        with pipeline_conn.pipeline():
+            cur = pipeline_conn.cursor()
             for i in range(5):
                 cur.execute("SELECT * FROM no_existing_table")
             cur.fetchone()
 
-    conn.close()
     no_out_of_sync()
@@ -1,5 +1,6 @@
 import psycopg2
 import pytest
+from psycopg2.pool import SimpleConnectionPool
 from globals import admin
 
 queries = [
@@ -17,25 +18,45 @@ queries = [
 ]
 
 
+DSN = "host=127.0.0.1 port=6432 user=pgdog password=pgdog"
+
+
+@pytest.fixture(scope="module")
+def role_pools():
+    """One single-connection pool per pgdog.role, shared by this module's tests."""
+    pools = {
+        "replica": SimpleConnectionPool(1, 1, DSN + " options='-c pgdog.role=replica'"),
+        "primary": SimpleConnectionPool(1, 1, DSN + " options='-c pgdog.role=primary'"),
+        "default": SimpleConnectionPool(1, 1, DSN),
+    }
+
+    yield pools
+
+    for pool in pools.values():
+        pool.closeall()
+
+
+def _checkout(pool):
+    conn = pool.getconn()
+    conn.autocommit = False
+    yield conn
+    # Rolls back anything the test left open.
+    pool.putconn(conn)
+
+
 @pytest.fixture
-def conn_reads():
-    return psycopg2.connect(
-        "host=127.0.0.1 port=6432 user=pgdog password=pgdog "
-        "options='-c pgdog.role=replica'"
-    )
+def conn_reads(role_pools):
+    yield from _checkout(role_pools["replica"])
 
 
 @pytest.fixture
-def conn_writes():
-    return psycopg2.connect(
-        "host=127.0.0.1 port=6432 user=pgdog password=pgdog "
-        "options='-c pgdog.role=primary'"
-    )
+def conn_writes(role_pools):
+    yield from _checkout(role_pools["primary"])
 
 
 @pytest.fixture
-def conn_default():
-    return psycopg2.connect("host=127.0.0.1 port=6432 user=pgdog password=pgdog")
+def conn_default(role_pools):
+    yield from _checkout(role_pools["default"])
 
 
 def test_conn_writes(conn_writes):